@@ -1,35 +1,82 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
+import io
 import json
 import os
+import shutil
 import sys
+import tempfile
 import hashlib
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    # Optional: pybase64 uses SIMD codecs and mirrors the stdlib base64 API
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 # Import existing dungeon analysis modules (using local copy of src)
 from src.adapter_manager import AdapterManager
 from src.quality_assessor import DungeonQualityAssessor
-from src.batch_assess import assess_all_maps
+from src.batch_assess import assess_all_maps, batch_assess_quality
+from src.json_io import json_loads
+# visualize_dungeon is aliased because the /api/visualize view function below uses that name
+from src.visualizer import DungeonVisualizer, visualize_dungeon as render_dungeon_image
 
 # Define project root directory
 project_root = Path(__file__).parent.parent
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS support
+# API responses are only consumed by the frontend; skip the indented output Flask uses in debug mode
+app.json.compact = True
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-# Initialize adapter manager and quality assessor
+# Initialize adapter manager, quality assessor and visualizer (all stateless between requests)
 adapter_manager = AdapterManager()
-quality_assessor = DungeonQualityAssessor()
+quality_assessor = DungeonQualityAssessor(adapter_manager=adapter_manager)
+dungeon_visualizer = DungeonVisualizer()
 
 # Memory cache system
 file_cache = {}
 
+# 按文件名查找地下城文件时的搜索目录（按优先级排列）：
+# watabou_dungeons → samples子目录 → temp_uploads（用户上传的文件）→ output子目录
+DUNGEON_SEARCH_DIRS = (
+    project_root / 'watabou_dungeons',
+    *(project_root / 'samples' / subdir
+      for subdir in ('watabou_test', 'source_test_1', 'source_format_1', 'source_format_2')),
+    project_root / 'temp_uploads',
+    *(project_root / 'output' / subdir
+      for subdir in ('watabou_reports', 'watabou_reports2', 'watabou_test', 'edger', 'chat_ana')),
+)
+
+def _find_dungeon_file(filename):
+    """在DUNGEON_SEARCH_DIRS中按顺序查找文件，返回(路径, 修改时间)，找不到返回(None, None)
+    
+    一次stat同时完成存在性检查并取得缓存键所需的mtime
+    """
+    for search_dir in DUNGEON_SEARCH_DIRS:
+        test_path = search_dir / filename
+        try:
+            return test_path, test_path.stat().st_mtime
+        except OSError:
+            continue
+    return None, None
+
+@lru_cache(maxsize=32)
+def _load_and_convert(path, mtime):
+    """Load and convert a dungeon file on disk; mtime is part of the cache key so edited files are re-read"""
+    with open(path, 'rb') as f:
+        data = json_loads(f.read())
+    return adapter_manager.convert(data)
+
 def cleanup_expired_cache():
     """Clean expired cache files"""
     current_time = datetime.now()
@@ -72,16 +119,18 @@ def analyze_dungeon():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Read file content and generate file ID
-        file_content = file.read().decode('utf-8')
-        file_id = hashlib.md5(file_content.encode()).hexdigest()
+        # Read file content and generate file ID (hash the raw bytes, no decode/re-encode round trip)
+        raw_content = file.read()
+        file_id = hashlib.blake2b(raw_content, digest_size=16).hexdigest()
+        file_content = raw_content.decode('utf-8')
         
         # Store to cache
         file_cache[file_id] = {
             'filename': file.filename,
             'content': file_content,
             'timestamp': datetime.now(),
-            'data': json.loads(file_content)
+            # Parse straight from the uploaded bytes rather than the decoded str copy
+            'data': json_loads(raw_content)
         }
         
         try:
@@ -199,29 +248,20 @@ def visualize_dungeon_by_id():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 生成可视化图像
-            from src.visualizer import visualize_dungeon
-            upload_dir = Path(project_root) / 'temp_uploads'
-            upload_dir.mkdir(exist_ok=True)
-            output_path = upload_dir / f"{Path(file_data['filename']).stem}_visualization.png"
+            # 生成可视化图像（直接渲染到内存，无需临时文件）
+            png_buffer = io.BytesIO()
             
-            success = visualize_dungeon(
+            success = render_dungeon_image(
                 unified_data, 
-                str(output_path),
+                png_buffer,
                 show_connections=options.get('show_connections', True),
                 show_room_ids=options.get('show_room_ids', True),
                 show_grid=options.get('show_grid', True),
                 show_game_elements=options.get('show_game_elements', True)
             )
             
-            if success and output_path.exists():
-                # 读取生成的图像文件并转换为base64
-                import base64
-                with open(output_path, 'rb') as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                
-                # 清理临时文件
-                output_path.unlink()
+            if success:
+                img_data = base64.b64encode(png_buffer.getvalue()).decode('utf-8')
                 
                 return jsonify({
                     'success': True,
@@ -274,12 +314,8 @@ def get_visualization_data_by_id():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 转换为前端可用的格式
-            from src.visualizer import DungeonVisualizer
-            visualizer = DungeonVisualizer()
-            
-            # 提取可视化数据
-            visualization_data = visualizer._extract_visualization_data(unified_data)
+            # 提取可视化数据（转换为前端可用的格式）
+            visualization_data = dungeon_visualizer._extract_visualization_data(unified_data)
             
             return jsonify({
                 'success': True,
@@ -348,38 +384,7 @@ def analyze_dungeon_by_filename():
         options = json.loads(analysis_options) if analysis_options else {}
         
         # 查找文件
-        file_path = None
-        
-        # 首先在watabou_dungeons目录中查找
-        watabou_dir = Path(project_root) / 'watabou_dungeons'
-        test_path = watabou_dir / filename
-        if test_path.exists():
-            file_path = test_path
-        
-        # 如果不在watabou_dungeons中，尝试其他目录
-        if not file_path:
-            samples_dir = Path(project_root) / 'samples'
-            for subdir in ['watabou_test', 'source_test_1', 'source_format_1', 'source_format_2']:
-                test_path = samples_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
-        
-        # 如果还是找不到，尝试在temp_uploads目录中查找（用户上传的文件）
-        if not file_path:
-            temp_dir = Path(project_root) / 'temp_uploads'
-            test_path = temp_dir / filename
-            if test_path.exists():
-                file_path = test_path
-        
-        # 如果还是找不到，尝试在output目录中查找
-        if not file_path:
-            output_dir = Path(project_root) / 'output'
-            for subdir in ['watabou_reports', 'watabou_reports2', 'watabou_test', 'edger', 'chat_ana']:
-                test_path = output_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
+        file_path, file_mtime = _find_dungeon_file(filename)
         
         if not file_path:
             return jsonify({
@@ -388,12 +393,8 @@ def analyze_dungeon_by_filename():
             }), 404
         
         try:
-            # 读取文件数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 使用现有的适配器管理器处理文件
-            unified_data = adapter_manager.convert(data)
+            # 读取并转换文件（按路径+修改时间缓存）
+            unified_data = _load_and_convert(str(file_path), file_mtime)
             
             if unified_data is None:
                 return jsonify({
@@ -430,38 +431,7 @@ def get_visualization_data_by_filename():
             return jsonify({'error': '没有提供文件名'}), 400
         
         # 查找文件
-        file_path = None
-        
-        # 首先在watabou_dungeons目录中查找
-        watabou_dir = Path(project_root) / 'watabou_dungeons'
-        test_path = watabou_dir / filename
-        if test_path.exists():
-            file_path = test_path
-        
-        # 如果不在watabou_dungeons中，尝试其他目录
-        if not file_path:
-            samples_dir = Path(project_root) / 'samples'
-            for subdir in ['watabou_test', 'source_test_1', 'source_format_1', 'source_format_2']:
-                test_path = samples_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
-        
-        # 如果还是找不到，尝试在temp_uploads目录中查找（用户上传的文件）
-        if not file_path:
-            temp_dir = Path(project_root) / 'temp_uploads'
-            test_path = temp_dir / filename
-            if test_path.exists():
-                file_path = test_path
-        
-        # 如果还是找不到，尝试在output目录中查找
-        if not file_path:
-            output_dir = Path(project_root) / 'output'
-            for subdir in ['watabou_reports', 'watabou_reports2', 'watabou_test', 'edger', 'chat_ana']:
-                test_path = output_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
+        file_path, file_mtime = _find_dungeon_file(filename)
         
         if not file_path:
             return jsonify({
@@ -470,12 +440,8 @@ def get_visualization_data_by_filename():
             }), 404
         
         try:
-            # 读取文件数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 使用现有的适配器管理器处理文件
-            unified_data = adapter_manager.convert(data)
+            # 读取并转换文件（按路径+修改时间缓存）
+            unified_data = _load_and_convert(str(file_path), file_mtime)
             
             if unified_data is None:
                 return jsonify({
@@ -483,12 +449,8 @@ def get_visualization_data_by_filename():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 转换为前端可用的格式
-            from src.visualizer import DungeonVisualizer
-            visualizer = DungeonVisualizer()
-            
-            # 提取可视化数据
-            visualization_data = visualizer._extract_visualization_data(unified_data)
+            # 提取可视化数据（转换为前端可用的格式）
+            visualization_data = dungeon_visualizer._extract_visualization_data(unified_data)
             
             return jsonify({
                 'success': True,
@@ -520,38 +482,7 @@ def visualize_dungeon_by_filename():
         options = json.loads(visualization_options) if visualization_options else {}
         
         # 查找文件
-        file_path = None
-        
-        # 首先在watabou_dungeons目录中查找
-        watabou_dir = Path(project_root) / 'watabou_dungeons'
-        test_path = watabou_dir / filename
-        if test_path.exists():
-            file_path = test_path
-        
-        # 如果不在watabou_dungeons中，尝试其他目录
-        if not file_path:
-            samples_dir = Path(project_root) / 'samples'
-            for subdir in ['watabou_test', 'source_test_1', 'source_format_1', 'source_format_2']:
-                test_path = samples_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
-        
-        # 如果还是找不到，尝试在temp_uploads目录中查找（用户上传的文件）
-        if not file_path:
-            temp_dir = Path(project_root) / 'temp_uploads'
-            test_path = temp_dir / filename
-            if test_path.exists():
-                file_path = test_path
-        
-        # 如果还是找不到，尝试在output目录中查找
-        if not file_path:
-            output_dir = Path(project_root) / 'output'
-            for subdir in ['watabou_reports', 'watabou_reports2', 'watabou_test', 'edger', 'chat_ana']:
-                test_path = output_dir / subdir / filename
-                if test_path.exists():
-                    file_path = test_path
-                    break
+        file_path, file_mtime = _find_dungeon_file(filename)
         
         if not file_path:
             return jsonify({
@@ -560,12 +491,8 @@ def visualize_dungeon_by_filename():
             }), 404
         
         try:
-            # 读取文件数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 使用现有的适配器管理器处理文件
-            unified_data = adapter_manager.convert(data)
+            # 读取并转换文件（按路径+修改时间缓存）
+            unified_data = _load_and_convert(str(file_path), file_mtime)
             
             if unified_data is None:
                 return jsonify({
@@ -573,29 +500,20 @@ def visualize_dungeon_by_filename():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 生成可视化图像
-            from src.visualizer import visualize_dungeon
-            upload_dir = Path(project_root) / 'temp_uploads'
-            upload_dir.mkdir(exist_ok=True)
-            output_path = upload_dir / f"{Path(filename).stem}_visualization.png"
+            # 生成可视化图像（直接渲染到内存，无需临时文件）
+            png_buffer = io.BytesIO()
             
-            success = visualize_dungeon(
+            success = render_dungeon_image(
                 unified_data, 
-                str(output_path),
+                png_buffer,
                 show_connections=options.get('show_connections', True),
                 show_room_ids=options.get('show_room_ids', True),
                 show_grid=options.get('show_grid', True),
                 show_game_elements=options.get('show_game_elements', True)
             )
             
-            if success and output_path.exists():
-                # 读取生成的图像文件并转换为base64
-                import base64
-                with open(output_path, 'rb') as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                
-                # 清理临时文件
-                output_path.unlink()
+            if success:
+                img_data = base64.b64encode(png_buffer.getvalue()).decode('utf-8')
                 
                 return jsonify({
                     'success': True,
@@ -655,7 +573,8 @@ def analyze_batch():
             # 调用批量评估函数
             results = assess_all_maps(
                 input_dir=str(temp_input_dir),
-                output_dir=str(temp_output_dir)
+                output_dir=str(temp_output_dir),
+                assessor=quality_assessor
             )
             
             return jsonify({
@@ -786,19 +705,9 @@ def visualize_dungeon():
         visualization_options = request.form.get('options', '{}')
         options = json.loads(visualization_options) if visualization_options else {}
         
-        # 保存上传的文件
-        upload_dir = Path(project_root) / 'temp_uploads'
-        upload_dir.mkdir(exist_ok=True)
-        
-        # 只使用文件名，不包含路径
-        filename = Path(file.filename).name
-        file_path = upload_dir / filename
-        file.save(str(file_path))
-        
         try:
-            # 读取文件数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # 直接解析内存中的上传内容，不再落盘后重新读取
+            data = json_loads(file.read())
             
             # 使用现有的适配器管理器处理文件
             unified_data = adapter_manager.convert(data)
@@ -809,28 +718,20 @@ def visualize_dungeon():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 生成可视化图像
-            from src.visualizer import visualize_dungeon
-            output_path = upload_dir / f"{Path(file.filename).stem}_visualization.png"
+            # 生成可视化图像（直接渲染到内存，无需临时文件）
+            png_buffer = io.BytesIO()
             
-            success = visualize_dungeon(
+            success = render_dungeon_image(
                 unified_data, 
-                str(output_path),
+                png_buffer,
                 show_connections=options.get('show_connections', True),
                 show_room_ids=options.get('show_room_ids', True),
                 show_grid=options.get('show_grid', True),
                 show_game_elements=options.get('show_game_elements', True)
             )
             
-            if success and output_path.exists():
-                # 读取生成的图像文件并转换为base64
-                import base64
-                with open(output_path, 'rb') as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                
-                # 清理临时文件
-                output_path.unlink()
-                file_path.unlink()
+            if success:
+                img_data = base64.b64encode(png_buffer.getvalue()).decode('utf-8')
                 
                 return jsonify({
                     'success': True,
@@ -839,17 +740,12 @@ def visualize_dungeon():
                     'filename': file.filename
                 })
             else:
-                # 清理临时文件
-                file_path.unlink()
                 return jsonify({
                     'success': False,
                     'error': '可视化生成失败'
                 }), 500
             
         except Exception as e:
-            # 清理临时文件
-            if file_path.exists():
-                file_path.unlink()
             raise e
             
     except Exception as e:
@@ -858,9 +754,9 @@ def visualize_dungeon():
             'error': str(e)
         }), 500
 
-@app.route('/api/visualize-data', methods=['POST'])
-def get_visualization_data():
-    """获取地下城可视化数据（用于前端渲染）"""
+@app.route('/api/visualize-binary', methods=['POST'])
+def visualize_dungeon_binary():
+    """生成地下城可视化图像，直接以image/png返回原始字节（不经过base64和JSON）"""
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file uploaded'}), 400
@@ -869,19 +765,13 @@ def get_visualization_data():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # 保存上传的文件
-        upload_dir = Path(project_root) / 'temp_uploads'
-        upload_dir.mkdir(exist_ok=True)
-        
-        # 只使用文件名，不包含路径
-        filename = Path(file.filename).name
-        file_path = upload_dir / filename
-        file.save(str(file_path))
+        # 获取可视化选项
+        visualization_options = request.form.get('options', '{}')
+        options = json.loads(visualization_options) if visualization_options else {}
         
         try:
-            # 读取文件数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # 直接解析内存中的上传内容，不再落盘后重新读取
+            data = json_loads(file.read())
             
             # 使用现有的适配器管理器处理文件
             unified_data = adapter_manager.convert(data)
@@ -892,15 +782,66 @@ def get_visualization_data():
                     'error': 'Unable to recognize or convert file format'
                 }), 400
             
-            # 转换为前端可用的格式
-            from src.visualizer import DungeonVisualizer
-            visualizer = DungeonVisualizer()
+            # 生成可视化图像（直接渲染到内存，无需临时文件）
+            png_buffer = io.BytesIO()
             
-            # 提取可视化数据
-            visualization_data = visualizer._extract_visualization_data(unified_data)
+            success = render_dungeon_image(
+                unified_data, 
+                png_buffer,
+                show_connections=options.get('show_connections', True),
+                show_room_ids=options.get('show_room_ids', True),
+                show_grid=options.get('show_grid', True),
+                show_game_elements=options.get('show_game_elements', True)
+            )
             
-            # 清理临时文件
-            file_path.unlink()
+            if success:
+                png_buffer.seek(0)
+                return send_file(
+                    png_buffer,
+                    mimetype='image/png',
+                    download_name=f"{Path(file.filename).stem}_visualization.png"
+                )
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': '可视化生成失败'
+                }), 500
+            
+        except Exception as e:
+            raise e
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/visualize-data', methods=['POST'])
+def get_visualization_data():
+    """获取地下城可视化数据（用于前端渲染）"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        try:
+            # 直接解析内存中的上传内容，不再落盘后重新读取
+            data = json_loads(file.read())
+            
+            # 使用现有的适配器管理器处理文件
+            unified_data = adapter_manager.convert(data)
+            
+            if unified_data is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Unable to recognize or convert file format'
+                }), 400
+            
+            # 提取可视化数据（转换为前端可用的格式）
+            visualization_data = dungeon_visualizer._extract_visualization_data(unified_data)
             
             return jsonify({
                 'success': True,
@@ -910,9 +851,72 @@ def get_visualization_data():
             })
             
         except Exception as e:
-            # 清理临时文件
-            if file_path.exists():
-                file_path.unlink()
+            raise e
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/visualize-full', methods=['POST'])
+def visualize_dungeon_full():
+    """一次请求同时返回可视化数据和图像（合并 /api/visualize-data 与 /api/visualize，只解析和转换一次）"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        # 获取可视化选项
+        visualization_options = request.form.get('options', '{}')
+        options = json.loads(visualization_options) if visualization_options else {}
+        
+        try:
+            # 直接解析内存中的上传内容，不再落盘后重新读取
+            data = json_loads(file.read())
+            
+            # 使用现有的适配器管理器处理文件
+            unified_data = adapter_manager.convert(data)
+            
+            if unified_data is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Unable to recognize or convert file format'
+                }), 400
+            
+            # 同一个unified_data既用于提取前端数据，也用于渲染图像
+            visualization_data = dungeon_visualizer._extract_visualization_data(unified_data)
+            
+            png_buffer = io.BytesIO()
+            success = render_dungeon_image(
+                unified_data, 
+                png_buffer,
+                show_connections=options.get('show_connections', True),
+                show_room_ids=options.get('show_room_ids', True),
+                show_grid=options.get('show_grid', True),
+                show_game_elements=options.get('show_game_elements', True)
+            )
+            
+            if success:
+                img_data = base64.b64encode(png_buffer.getvalue()).decode('utf-8')
+                
+                return jsonify({
+                    'success': True,
+                    'visualization_data': visualization_data,
+                    'image_data': img_data,
+                    'unified_data': unified_data,
+                    'filename': file.filename
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': '可视化生成失败'
+                }), 500
+            
+        except Exception as e:
             raise e
             
     except Exception as e:
@@ -937,9 +941,6 @@ def batch_test():
         options = json.loads(test_options) if test_options else {}
         
         # 创建临时目录存储文件
-        import tempfile
-        import shutil
-        
         temp_dir = tempfile.mkdtemp()
         output_dir = os.path.join(temp_dir, 'reports')
         os.makedirs(output_dir, exist_ok=True)
@@ -958,7 +959,7 @@ def batch_test():
             
             # 执行批量评估
             from src.batch_assess import batch_assess_files
-            results = batch_assess_files(file_paths, output_dir, timeout_per_file=30)
+            results = batch_assess_files(file_paths, output_dir, timeout_per_file=30, assessor=quality_assessor)
             
             # 读取生成的报告文件
             summary_file = os.path.join(output_dir, "batch_assessment_summary.json")
@@ -1017,11 +1018,11 @@ def batch_test_directory():
         
         try:
             # 执行批量评估
-            from src.batch_assess import batch_assess_quality
             results = batch_assess_quality(
                 input_dir=input_dir,
                 output_dir=output_dir,
-                timeout_per_file=timeout_per_file
+                timeout_per_file=timeout_per_file,
+                assessor=quality_assessor
             )
             
             # 读取生成的汇总报告
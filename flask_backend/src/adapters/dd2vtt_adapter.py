@@ -1,3 +1,4 @@
+import logging
 from typing import Dict, Any, Optional
 from src.adapters.base import BaseAdapter
 from src.schema import UnifiedDungeonFormat
@@ -5,6 +6,8 @@ from src.schema import UnifiedDungeonFormat
 import numpy as np
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 class DD2VTTAdapter(BaseAdapter):
     """适配 dd2vtt (DungeonDraft to VTT) 格式。"""
     @property
@@ -59,7 +62,7 @@ class DD2VTTAdapter(BaseAdapter):
                     p2 = (seg[1]["x"], seg[1]["y"])
                     wall_segments.append((p1, p2))
 
-            print(f"处理了 {len(wall_segments)} 个墙段")
+            logger.debug("处理了 %d 个墙段", len(wall_segments))
             
             # --- 基于端点的房间推断 ---
             rooms = self._infer_rooms_from_endpoints(wall_segments, map_size)
@@ -82,8 +85,7 @@ class DD2VTTAdapter(BaseAdapter):
             })
             return unified
         except Exception as e:
-            import logging
-            logging.error(f"Error converting dd2vtt: {e}")
+            logger.error(f"Error converting dd2vtt: {e}")
             return None
 
     def _infer_rooms_from_endpoints(self, wall_segments, map_size):
@@ -94,10 +96,10 @@ class DD2VTTAdapter(BaseAdapter):
         3. 为每个聚类创建房间
         """
         if not wall_segments:
-            print("没有墙段数据，创建默认房间")
+            logger.debug("没有墙段数据，创建默认房间")
             return self._create_default_rooms(map_size)
             
-        print(f"使用端点聚类推断房间，墙段数量: {len(wall_segments)}")
+        logger.debug("使用端点聚类推断房间，墙段数量: %d", len(wall_segments))
         
         # 1. 收集所有端点
         all_points = []
@@ -114,7 +116,7 @@ class DD2VTTAdapter(BaseAdapter):
         # 2. 使用简单的距离聚类
         clusters = self._simple_clustering(points_array, eps=10.0)
         
-        print(f"找到 {len(clusters)} 个端点聚类")
+        logger.debug("找到 %d 个端点聚类", len(clusters))
         
         # 3. 为每个聚类创建房间
         rooms = []
@@ -151,10 +153,10 @@ class DD2VTTAdapter(BaseAdapter):
         
         # 如果没有找到房间，使用备用方法
         if not rooms:
-            print("端点聚类失败，使用备用方法")
+            logger.debug("端点聚类失败，使用备用方法")
             return self._infer_rooms_simple(wall_segments, map_size)
         
-        print(f"端点聚类创建了 {len(rooms)} 个房间")
+        logger.debug("端点聚类创建了 %d 个房间", len(rooms))
         return rooms
     
     def _simple_clustering(self, points, eps=10.0):
@@ -204,10 +206,10 @@ class DD2VTTAdapter(BaseAdapter):
         简单的房间推断：基于地图尺寸创建占位房间
         """
         if not wall_segments:
-            print("没有墙段数据，创建默认房间")
+            logger.debug("没有墙段数据，创建默认房间")
             return self._create_default_rooms(map_size)
             
-        print(f"使用简单房间推断，地图尺寸: {map_size}")
+        logger.debug("使用简单房间推断，地图尺寸: %s", map_size)
         
         # 计算地图边界
         all_x = []
@@ -222,7 +224,7 @@ class DD2VTTAdapter(BaseAdapter):
         min_x, max_x = min(all_x), max(all_x)
         min_y, max_y = min(all_y), max(all_y)
         
-        print(f"墙段边界: ({min_x:.1f}, {min_y:.1f}) 到 ({max_x:.1f}, {max_y:.1f})")
+        logger.debug("墙段边界: (%.1f, %.1f) 到 (%.1f, %.1f)", min_x, min_y, max_x, max_y)
         
         # 创建几个大房间覆盖地图区域
         rooms = []
@@ -254,7 +256,7 @@ class DD2VTTAdapter(BaseAdapter):
                         "name": f"Area {i*3+j+1}"
                     })
         
-        print(f"创建了 {len(rooms)} 个房间")
+        logger.debug("创建了 %d 个房间", len(rooms))
         return rooms
     
     def _create_default_rooms(self, map_size):
@@ -279,10 +281,10 @@ class DD2VTTAdapter(BaseAdapter):
         3. 连接房间之间的路径
         """
         if not wall_segments:
-            print("没有墙段数据，无法推断走廊")
+            logger.debug("没有墙段数据，无法推断走廊")
             return []
             
-        print(f"推断走廊，墙段数量: {len(wall_segments)}")
+        logger.debug("推断走廊，墙段数量: %d", len(wall_segments))
         
         # 首先获取房间信息（如果还没有房间，先创建）
         rooms = self._infer_rooms_from_endpoints(wall_segments, map_size)
@@ -313,7 +315,7 @@ class DD2VTTAdapter(BaseAdapter):
             corridor["name"] = f"Corridor {i}"
             corridors.append(corridor)
         
-        print(f"推断出 {len(corridors)} 个走廊")
+        logger.debug("推断出 %d 个走廊", len(corridors))
         return corridors
     
     def _find_corridors_between_rooms(self, rooms, wall_segments):
@@ -659,7 +661,7 @@ class DD2VTTAdapter(BaseAdapter):
         
         # 找出孤立的房间
         isolated_rooms = [room_id for room_id, count in room_connections.items() if count == 0]
-        print(f"发现 {len(isolated_rooms)} 个孤立房间: {isolated_rooms}")
+        logger.debug("发现 %d 个孤立房间: %s", len(isolated_rooms), isolated_rooms)
         
         # 为孤立房间添加连接
         added_connections = 0
@@ -693,13 +695,13 @@ class DD2VTTAdapter(BaseAdapter):
                     room_connections[room1['id']] += 1
                     room_connections[room2['id']] += 1
                     added_connections += 1
-                    print(f"添加连接: {room1['name']} <-> {room2['name']} (距离: {distance:.2f})")
+                    logger.debug("添加连接: %s <-> %s (距离: %.2f)", room1['name'], room2['name'], distance)
                     
                     # 限制添加的连接数量，避免过度连接
                     if added_connections >= 10:
                         break
         
-        print(f"总共添加了 {added_connections} 个新连接")
+        logger.debug("总共添加了 %d 个新连接", added_connections)
         return corridors
     
     def _count_existing_connections(self, rooms, wall_segments):
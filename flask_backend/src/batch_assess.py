@@ -9,18 +9,24 @@ import json
 import time
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.quality_assessor import DungeonQualityAssessor
+from src.json_io import json_loads, json_dumps_bytes
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _save_json(path, data) -> None:
+    """序列化为完整字节串后一次写入（json.dump会按片段多次调用write）"""
+    Path(path).write_bytes(json_dumps_bytes(data))
+
 class TimeoutError(Exception):
     """超时异常"""
     pass
 
-def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports", timeout_per_file: int = 30) -> Dict[str, Any]:
+def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports", timeout_per_file: int = 30,
+                    assessor: Optional[DungeonQualityAssessor] = None) -> Dict[str, Any]:
     """评估目录中所有统一格式的地牢地图文件（包括子文件夹）"""
     
     input_path = Path(input_dir)
@@ -37,7 +43,9 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
     logger.info(f"{len(json_files)} Maps to be assessed (including subdirectories)")
     
     results = {}
-    assessor = DungeonQualityAssessor()
+    # 调用方（如Flask应用）可传入已加载规则的评估器，避免每次调用都重新加载规则和适配器
+    if assessor is None:
+        assessor = DungeonQualityAssessor()
     
     for i, json_file in enumerate(json_files, 1):
         try:
@@ -47,8 +55,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
             
             try:
                 # 读取地图数据
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = json_loads(json_file.read_bytes())
                 
                 # 评估质量
                 start_time = time.time()
@@ -71,8 +78,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
                 # 确保报告文件的目录存在
                 report_file.parent.mkdir(parents=True, exist_ok=True)
                 
-                with open(report_file, 'w', encoding='utf-8') as f:
-                    json.dump(metrics, f, ensure_ascii=False, indent=2)
+                _save_json(report_file, metrics)
                 
                 # 收集结果，使用相对路径作为key
                 results[str(relative_path)] = {
@@ -109,8 +115,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
         
         # 保存汇总报告
         summary_file = output_path / "quality_summary_report.json"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_report, f, ensure_ascii=False, indent=2)
+        _save_json(summary_file, summary_report)
         
         # 打印汇总报告
         print_summary_report(summary_report)
@@ -288,7 +293,8 @@ def print_summary_report(report: Dict[str, Any]) -> None:
     
     print("="*60)
 
-def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, timeout_per_file: int = 30):
+def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, timeout_per_file: int = 30,
+                         assessor: Optional[DungeonQualityAssessor] = None):
     """批量评估地图质量 - CLI 调用的接口函数（支持递归搜索子文件夹）"""
     try:
         logger.info(f"开始批量评估，输入目录: {input_dir}（包括子文件夹）")
@@ -304,11 +310,10 @@ def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inferen
         input_dir_name = os.path.basename(input_dir.rstrip('/'))
         output_file = os.path.join(output_dir, f"{input_dir_name}_batch_report.json")
         
-        results = assess_all_maps(input_dir, output_dir, timeout_per_file)
+        results = assess_all_maps(input_dir, output_dir, timeout_per_file, assessor=assessor)
         
         # 保存到指定的输出文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        _save_json(output_file, results)
         
         logger.info(f"批量评估报告已保存到: {output_file}")
         return results
@@ -18,6 +18,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.adapter_manager import AdapterManager
 from src.visualizer import visualize_dungeon
 from src.quality_assessor import DungeonQualityAssessor
+from src.json_io import json_loads, json_dumps_bytes
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -26,8 +27,7 @@ logger = logging.getLogger(__name__)
 def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
     """加载并读取JSON文件"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_loads(Path(file_path).read_bytes())
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return None
@@ -42,8 +42,8 @@ def save_json_file(data: Dict[str, Any], file_path: str) -> bool:
     """将数据保存为JSON文件"""
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 先整体序列化为字节串再一次写入，避免json.dump按片段多次调用write
+        Path(file_path).write_bytes(json_dumps_bytes(data))
         logger.info(f"File saved: {file_path}")
         return True
     except Exception as e:
@@ -158,12 +158,9 @@ def visualize_file(input_path: str, output_path: Optional[str] = None, show_room
 # 合并/精简assess_quality相关实现，只保留一套评估报告输出逻辑
 def assess_quality(input_file: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0) -> bool:
     """评估地图质量，并自动保存详细报告到output/reports"""
-    import os
-    import json
     try:
         # 读取输入文件
-        with open(input_file, 'r', encoding='utf-8') as f:
-            dungeon_data = json.load(f)
+        dungeon_data = json_loads(Path(input_file).read_bytes())
         # 初始化质量评估器
         assessor = DungeonQualityAssessor(
             enable_spatial_inference=enable_spatial_inference,
@@ -188,11 +185,10 @@ def assess_quality(input_file: str, enable_spatial_inference: bool = True, adjac
         print("=" * 50)
         # 自动保存详细报告
         report_dir = "output/reports"
-        os.makedirs(report_dir, exist_ok=True)
         base_name = os.path.splitext(os.path.basename(input_file))[0]
         report_path = os.path.join(report_dir, f"{base_name}_report.json")
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        if not save_json_file(result, report_path):
+            return False
         print(f"详细评估报告已保存到: {report_path}")
         return True
     except Exception as e:
@@ -358,8 +354,7 @@ def main():
 
     elif args.command == 'assess':
         try:
-            with open(args.input, 'r', encoding='utf-8') as f:
-                dungeon_data = json.load(f)
+            dungeon_data = json_loads(Path(args.input).read_bytes())
 
             if args.infer_connections:
                 logger.info("Enable spatial inference to complete connections...")
@@ -393,11 +388,10 @@ def main():
             print("\n" + "="*50 + "\n")
             # 自动保存详细报告
             report_dir = "output/reports"
-            os.makedirs(report_dir, exist_ok=True)
             base_name = os.path.splitext(os.path.basename(args.input))[0]
             auto_report_path = os.path.join(report_dir, f"{base_name}_report.json")
-            with open(auto_report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            if not save_json_file(report, auto_report_path):
+                sys.exit(1)
             print(f"Automaticaly saved detailed report to: {auto_report_path}")
         except Exception as e:
             logger.error(f"Error during assessment: {e}")
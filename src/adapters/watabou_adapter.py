@@ -3,6 +3,7 @@ from typing import Dict, Any, Optional
 import json
 from typing import Optional
 import click
+import numpy as np
 from loguru import logger
 
 from src.adapters.base import BaseAdapter
@@ -55,16 +56,21 @@ class WatabouAdapter(BaseAdapter):
             rect_to_notes = {idx: [] for idx in range(len(rects))}
             room_rect_indices = set()
             
-            # 找到包含notes的rects
+            # 矩形坐标一次性转为数组，后续的点-矩形判定都按整列广播计算
+            rect_arr = np.array([(r['x'], r['y'], r['w'], r['h']) for r in rects], dtype=np.float64).reshape(-1, 4)
+            rect_x, rect_y, rect_w, rect_h = rect_arr.T
+            
+            # 找到包含notes的rects（每个note归属第一个包含它的rect）
             for note in notes:
                 pos = note.get('pos')
                 if not pos: continue
-                for idx, rect in enumerate(rects):
-                    if (rect['x'] <= pos.get('x', -999) < rect['x'] + rect['w'] and
-                        rect['y'] <= pos.get('y', -999) < rect['y'] + rect['h']):
-                        room_rect_indices.add(idx)
-                        rect_to_notes[idx].append(note)
-                        break
+                px, py = pos.get('x', -999), pos.get('y', -999)
+                inside = np.flatnonzero((rect_x <= px) & (px < rect_x + rect_w) &
+                                        (rect_y <= py) & (py < rect_y + rect_h))
+                if inside.size:
+                    idx = int(inside[0])
+                    room_rect_indices.add(idx)
+                    rect_to_notes[idx].append(note)
             
             # 基于大小识别房间（面积大于等于6的矩形通常是房间）
             size_based_rooms = set()
@@ -105,37 +111,22 @@ class WatabouAdapter(BaseAdapter):
             doors = [{"id": f"door_{i}", "position": door_data} for i, door_data in enumerate(raw_doors)]
             
             # IMPROVED CONNECTION GENERATION - 基于门的方向和位置
+            # 所有门与所有矩形的边界判定一次算成 (门数, 矩形数) 的布尔矩阵；all_nodes与rects一一对应
+            door_arr = np.array([(d['position'].get('x', 0), d['position'].get('y', 0)) for d in doors],
+                                dtype=np.float64).reshape(-1, 2)
+            door_x, door_y = door_arr[:, :1], door_arr[:, 1:]
+            tolerance = 0.5  # 允许的误差范围
+            # 检查是否在水平边界（上边或下边）
+            on_horizontal = (((np.abs(door_y - rect_y) <= tolerance) | (np.abs(door_y - (rect_y + rect_h)) <= tolerance)) &
+                             (rect_x <= door_x) & (door_x <= rect_x + rect_w))
+            # 检查是否在垂直边界（左边或右边）
+            on_vertical = (((np.abs(door_x - rect_x) <= tolerance) | (np.abs(door_x - (rect_x + rect_w)) <= tolerance)) &
+                           (rect_y <= door_y) & (door_y <= rect_y + rect_h))
+            on_boundary = on_horizontal | on_vertical
+            
             connections = []
-            for door in doors:
-                door_pos = door['position']
-                door_x, door_y = door_pos.get('x', 0), door_pos.get('y', 0)
-                door_dir = door_pos.get('dir', {'x': 0, 'y': 0})
-                
-                connected_nodes_ids = []
-                
-                # 基于门的方向来更准确地识别连接的房间
-                for node in all_nodes:
-                    pos, size = node['position'], node['size']
-                    x, y, w, h = pos['x'], pos['y'], size['width'], size['height']
-                    
-                    # 检查门是否在房间的边界上
-                    tolerance = 0.5  # 允许的误差范围
-                    
-                    # 检查门是否在房间的边界附近
-                    on_boundary = False
-                    
-                    # 检查是否在水平边界（上边或下边）
-                    if (abs(door_y - y) <= tolerance or abs(door_y - (y + h)) <= tolerance):
-                        if x <= door_x <= x + w:
-                            on_boundary = True
-                    
-                    # 检查是否在垂直边界（左边或右边）
-                    if (abs(door_x - x) <= tolerance or abs(door_x - (x + w)) <= tolerance):
-                        if y <= door_y <= y + h:
-                            on_boundary = True
-                    
-                    if on_boundary:
-                        connected_nodes_ids.append(node['id'])
+            for door, door_on_boundary in zip(doors, on_boundary):
+                connected_nodes_ids = [all_nodes[idx]['id'] for idx in np.flatnonzero(door_on_boundary)]
                 
                 # 移除重复项并限制连接数量
                 connected_nodes_ids = list(set(connected_nodes_ids))
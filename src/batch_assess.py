@@ -16,18 +16,24 @@ import numpy as np
 from scipy import stats
 
 from .quality_assessor import DungeonQualityAssessor
+from .json_io import json_loads, json_dumps_bytes
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _save_json(path, data) -> None:
+    """序列化为完整字节串后一次写入（json.dump会按片段多次调用write）"""
+    Path(path).write_bytes(json_dumps_bytes(data))
+
 class TimeoutError(Exception):
     pass
 
 def timeout_handler(signum, frame):
     raise TimeoutError("操作超时")
 
-def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports", timeout_per_file: int = 30) -> Dict[str, Any]:
+def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports", timeout_per_file: int = 30,
+                    assessor: Optional[DungeonQualityAssessor] = None) -> Dict[str, Any]:
     """评估目录中所有统一格式的地牢地图文件"""
     
     input_path = Path(input_dir)
@@ -43,7 +49,9 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
     logger.info(f"{len(json_files)} map files have been located.")
     
     results = {}
-    assessor = DungeonQualityAssessor()
+    # 调用方（如Flask应用）可传入已加载规则的评估器，避免每次调用都重新加载规则和适配器
+    if assessor is None:
+        assessor = DungeonQualityAssessor()
     
     for i, json_file in enumerate(json_files, 1):
         try:
@@ -57,8 +65,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
             
             try:
                 # 读取地图数据
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = json_loads(json_file.read_bytes())
                 
                 # 评估质量
                 start_time = time.time()
@@ -74,8 +81,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
                 # 确保报告文件的目录存在
                 report_file.parent.mkdir(parents=True, exist_ok=True)
                 
-                with open(report_file, 'w', encoding='utf-8') as f:
-                    json.dump(metrics, f, ensure_ascii=False, indent=2)
+                _save_json(report_file, metrics)
                 
                 # 收集结果，使用相对路径作为key
                 results[str(relative_path)] = {
@@ -125,8 +131,7 @@ def assess_all_maps(input_dir: str = "output", output_dir: str = "output/reports
         
         # 保存汇总报告
         summary_file = output_path / "quality_summary_report.json"
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_report, f, ensure_ascii=False, indent=2)
+        _save_json(summary_file, summary_report)
         
         # 不打印到控制台，只记录到日志
         logger.info("Batch assessment completed; summary report generated.")
@@ -398,7 +403,8 @@ def generate_statistical_analysis(valid_results: Dict[str, Any]) -> Dict[str, An
         logger.error(f"Statistical analysis failed: {e}")
         return {'error': f'Statistical analysis failed: {str(e)}'}
 
-def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, timeout_per_file: int = 30) -> Dict[str, Any]:
+def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, timeout_per_file: int = 30,
+                         assessor: Optional[DungeonQualityAssessor] = None) -> Dict[str, Any]:
     """批量评估地图质量 - API 调用的接口函数（支持递归搜索子文件夹）"""
     try:
         logger.info(f"Commencing batch evaluation, input directory: {input_dir}")
@@ -414,11 +420,10 @@ def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inferen
         input_dir_name = os.path.basename(input_dir.rstrip('/'))
         output_file = os.path.join(output_dir, f"{input_dir_name}_batch_report.json")
         
-        results = assess_all_maps(input_dir, output_dir, timeout_per_file)
+        results = assess_all_maps(input_dir, output_dir, timeout_per_file, assessor=assessor)
         
         # 保存到指定的输出文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        _save_json(output_file, results)
         
         logger.info(f"The batch assessment report has been saved to: {output_file}")
         return results
@@ -427,7 +432,8 @@ def batch_assess_quality(input_dir: str, output_dir: str, enable_spatial_inferen
         logger.error(f"Batch evaluation failed: {e}")
         raise
 
-def batch_assess_files(file_paths: List[str], output_dir: str, timeout_per_file: int = 30) -> Dict[str, Any]:
+def batch_assess_files(file_paths: List[str], output_dir: str, timeout_per_file: int = 30,
+                       assessor: Optional[DungeonQualityAssessor] = None) -> Dict[str, Any]:
     """批量评估指定的文件列表"""
     try:
         logger.info(f"Commencing batch assessment {len(file_paths)} files")
@@ -436,7 +442,8 @@ def batch_assess_files(file_paths: List[str], output_dir: str, timeout_per_file:
         os.makedirs(output_dir, exist_ok=True)
         
         results = {}
-        assessor = DungeonQualityAssessor()
+        if assessor is None:
+            assessor = DungeonQualityAssessor()
         
         for i, file_path in enumerate(file_paths, 1):
             try:
@@ -448,8 +455,7 @@ def batch_assess_files(file_paths: List[str], output_dir: str, timeout_per_file:
                 
                 try:
                     # 读取地图数据
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = json_loads(Path(file_path).read_bytes())
                     
                     # 评估质量
                     start_time = time.time()
@@ -511,13 +517,11 @@ def batch_assess_files(file_paths: List[str], output_dir: str, timeout_per_file:
         
         # 保存汇总报告
         summary_file = os.path.join(output_dir, "batch_assessment_summary.json")
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary_report, f, ensure_ascii=False, indent=2)
+        _save_json(summary_file, summary_report)
         
         # 保存详细结果
         results_file = os.path.join(output_dir, "batch_assessment_results.json")
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        _save_json(results_file, results)
         
         logger.info(f"Batch evaluation completed. Results saved to: {output_dir}")
         return results
@@ -558,8 +562,7 @@ def analyze_cross_datasets(root_dir: str = "output/F_Q_Report", output_dir: str
             # 加载该子目录下的所有质量报告JSON文件
             for json_file in subdir.glob("quality_report_*.json"):
                 try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = json_loads(json_file.read_bytes())
                     
                     # 提取指标数据
                     row = {'filename': json_file.stem}
@@ -735,8 +738,7 @@ def generate_cross_dataset_analysis(datasets: Dict[str, pd.DataFrame], output_di
     }
     
     # 保存JSON报告
-    with open(output_path / 'cross_dataset_analysis.json', 'w', encoding='utf-8') as f:
-        json.dump(analysis_report, f, ensure_ascii=False, indent=2)
+    _save_json(output_path / 'cross_dataset_analysis.json', analysis_report)
     
     # 保存CSV统计文件
     for name, df in datasets.items():
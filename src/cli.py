@@ -18,6 +18,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.adapter_manager import AdapterManager
 from src.visualizer import visualize_dungeon
 from src.quality_assessor import DungeonQualityAssessor
+from src.json_io import json_loads, json_dumps_bytes
 from src.csv_exporter import CSVExporter
 
 # Set up logging
@@ -27,8 +28,7 @@ logger = logging.getLogger(__name__)
 def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
     """Load and read JSON file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_loads(Path(file_path).read_bytes())
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return None
@@ -43,8 +43,8 @@ def save_json_file(data: Dict[str, Any], file_path: str) -> bool:
     """Save data as JSON file"""
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 先整体序列化为字节串再一次写入，避免json.dump按片段多次调用write
+        Path(file_path).write_bytes(json_dumps_bytes(data))
         logger.info(f"File saved: {file_path}")
         return True
     except Exception as e:
@@ -73,8 +73,64 @@ def convert_single_file(adapter_manager: AdapterManager, input_path: str, output
     
     return True
 
-def convert_directory(adapter_manager: AdapterManager, input_dir: str, output_dir: str, format_name: Optional[str] = None, visualize: bool = False, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, enable_entrance_exit_identification: bool = True) -> int:
-    """Convert all JSON files in directory (including subdirectories)"""
+def _convert_directory_file(adapter_manager: AdapterManager, json_file: Path, input_path: Path, output_path: Path, format_name: Optional[str], visualize: bool, enable_spatial_inference: bool, adjacency_threshold: float, enable_entrance_exit_identification: bool) -> bool:
+    """Convert one file of a directory sweep, return True if the converted file was saved"""
+    # Calculate relative path to maintain directory structure
+    relative_path = json_file.relative_to(input_path)
+    print(f"Processing: {relative_path}")
+    
+    # Load source file
+    source_data = load_json_file(str(json_file))
+    if not source_data:
+        print(f"✗ Failed to load: {relative_path}")
+        return False
+    
+    # Convert data
+    unified_data = adapter_manager.convert(source_data, format_name, enable_spatial_inference, adjacency_threshold)
+    if not unified_data:
+        print(f"✗ Failed to convert: {relative_path}")
+        return False
+    
+    # Entrance/exit identification (if enabled)
+    if enable_entrance_exit_identification:
+        from src.schema import identify_entrance_exit
+        unified_data = identify_entrance_exit(unified_data)
+    
+    # Save converted file, maintaining directory structure
+    output_file = output_path / relative_path
+    # Ensure output file directory exists
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    if not save_json_file(unified_data, str(output_file)):
+        print(f"✗ Failed to save: {relative_path}")
+        return False
+    
+    print(f"✓ Successfully converted: {relative_path}")
+    if visualize:
+        vis_output_path = output_file.with_suffix('.png')
+        # Ensure visualization file directory exists
+        vis_output_path.parent.mkdir(parents=True, exist_ok=True)
+        from src.visualizer import visualize_dungeon
+        visualize_dungeon(unified_data, str(vis_output_path), show_room_ids=True, show_grid=True)
+        print(f"✓ Visualization saved: {vis_output_path.relative_to(output_path)}")
+    return True
+
+# Adapter manager of a convert-dir worker process, created once by the pool initializer
+_worker_adapter_manager: Optional[AdapterManager] = None
+
+def _init_convert_worker():
+    global _worker_adapter_manager
+    _worker_adapter_manager = AdapterManager()
+
+def _convert_directory_file_in_worker(task: tuple) -> bool:
+    return _convert_directory_file(_worker_adapter_manager, *task)
+
+def convert_directory(adapter_manager: AdapterManager, input_dir: str, output_dir: str, format_name: Optional[str] = None, visualize: bool = False, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0, enable_entrance_exit_identification: bool = True, workers: int = 1) -> int:
+    """Convert all JSON files in directory (including subdirectories)
+    
+    Files are independent, so with workers > 1 they are converted and rendered in a process pool
+    (pyplot keeps global figure state and the work is CPU-bound, so threads would not help).
+    """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     
@@ -89,48 +145,13 @@ def convert_directory(adapter_manager: AdapterManager, input_dir: str, output_di
     
     print(f"Found {len(json_files)} JSON files in {input_dir} and subdirectories")
     
-    success_count = 0
-    for json_file in json_files:
-        # Calculate relative path to maintain directory structure
-        relative_path = json_file.relative_to(input_path)
-        print(f"Processing: {relative_path}")
-        
-        # Load source file
-        source_data = load_json_file(str(json_file))
-        if not source_data:
-            print(f"✗ Failed to load: {relative_path}")
-            continue
-        
-        # Convert data
-        unified_data = adapter_manager.convert(source_data, format_name, enable_spatial_inference, adjacency_threshold)
-        if not unified_data:
-            print(f"✗ Failed to convert: {relative_path}")
-            continue
-        
-        # Entrance/exit identification (if enabled)
-        if enable_entrance_exit_identification:
-            from src.schema import identify_entrance_exit
-            unified_data = identify_entrance_exit(unified_data)
-        
-        # Save converted file, maintaining directory structure
-        output_file = output_path / relative_path
-        # Ensure output file directory exists
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        if save_json_file(unified_data, str(output_file)):
-            success_count += 1
-            print(f"✓ Successfully converted: {relative_path}")
-            if visualize:
-                vis_output_path = output_file.with_suffix('.png')
-                # Ensure visualization file directory exists
-                vis_output_path.parent.mkdir(parents=True, exist_ok=True)
-                from src.visualizer import visualize_dungeon
-                visualize_dungeon(unified_data, str(vis_output_path), show_room_ids=True, show_grid=True)
-                print(f"✓ Visualization saved: {vis_output_path.relative_to(output_path)}")
-        else:
-            print(f"✗ Failed to save: {relative_path}")
-    
-    return success_count
+    tasks = [(json_file, input_path, output_path, format_name, visualize, enable_spatial_inference,
+              adjacency_threshold, enable_entrance_exit_identification) for json_file in json_files]
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_convert_worker) as executor:
+            return sum(executor.map(_convert_directory_file_in_worker, tasks))
+    return sum(_convert_directory_file(adapter_manager, *task) for task in tasks)
 
 def detect_format(adapter_manager: AdapterManager, file_path: str) -> str:
     """Detect file format"""
@@ -159,12 +180,9 @@ def visualize_file(input_path: str, output_path: Optional[str] = None, show_room
 # Merge/simplify assess_quality related implementations, keep only one set of evaluation report output logic
 def assess_quality(input_file: str, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0) -> bool:
     """Evaluate dungeon quality and automatically save detailed report to output/reports"""
-    import os
-    import json
     try:
         # 读取输入文件
-        with open(input_file, 'r', encoding='utf-8') as f:
-            dungeon_data = json.load(f)
+        dungeon_data = json_loads(Path(input_file).read_bytes())
         # 初始化质量评估器
         assessor = DungeonQualityAssessor(
             enable_spatial_inference=enable_spatial_inference,
@@ -189,11 +207,10 @@ def assess_quality(input_file: str, enable_spatial_inference: bool = True, adjac
         print("=" * 50)
         # 自动保存详细报告
         report_dir = "output/reports"
-        os.makedirs(report_dir, exist_ok=True)
         base_name = os.path.splitext(os.path.basename(input_file))[0]
         report_path = os.path.join(report_dir, f"{base_name}_report.json")
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        if not save_json_file(result, report_path):
+            return False
         print(f"详细评估报告已保存到: {report_path}")
         return True
     except Exception as e:
@@ -279,6 +296,7 @@ def main():
     convert_dir_parser.add_argument('--no-spatial-inference', action='store_true', help='禁用空间推断功能 / disable spatial inference')
     convert_dir_parser.add_argument('--adjacency-threshold', type=float, default=1.0, help='邻接判定阈值 (默认: 1.0) / adjacency threshold (default: 1.0)')
     convert_dir_parser.add_argument('--no-entrance-exit-identification', action='store_true', help='禁用入口出口识别功能 / disable entrance/exit identification')
+    convert_dir_parser.add_argument('--workers', '-j', type=int, default=1, help='并行处理的进程数 (默认: 1) / number of worker processes (default: 1)')
     
     # detect 命令
     detect_parser = subparsers.add_parser('detect', help='检测文件格式 / detect file format')
@@ -366,7 +384,7 @@ def main():
             sys.exit(1)
     
     elif args.command == 'convert-dir':
-        success_count = convert_directory(adapter_manager, args.input, args.output, args.format, args.visualize, not args.no_spatial_inference, args.adjacency_threshold, not args.no_entrance_exit_identification)
+        success_count = convert_directory(adapter_manager, args.input, args.output, args.format, args.visualize, not args.no_spatial_inference, args.adjacency_threshold, not args.no_entrance_exit_identification, args.workers)
         print(f"\nConversion completed: {success_count} files successfully converted")
     
     elif args.command == 'detect':
@@ -390,8 +408,7 @@ def main():
 
     elif args.command == 'assess':
         try:
-            with open(args.input, 'r', encoding='utf-8') as f:
-                dungeon_data = json.load(f)
+            dungeon_data = json_loads(Path(args.input).read_bytes())
 
             if args.infer_connections:
                 logger.info("Enable spatial inference to complete connections...")
@@ -407,7 +424,8 @@ def main():
 
             assessor = DungeonQualityAssessor(
                 enable_spatial_inference=not args.no_spatial_inference,
-                adjacency_threshold=args.adjacency_threshold
+                adjacency_threshold=args.adjacency_threshold,
+                adapter_manager=adapter_manager
             )
             report = assessor.assess_quality(dungeon_data)
             print("\n" + "="*50)
@@ -425,11 +443,10 @@ def main():
             print("\n" + "="*50 + "\n")
             # 自动保存详细报告
             report_dir = "output/reports"
-            os.makedirs(report_dir, exist_ok=True)
             base_name = os.path.splitext(os.path.basename(args.input))[0]
             auto_report_path = os.path.join(report_dir, f"{base_name}_report.json")
-            with open(auto_report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            if not save_json_file(report, auto_report_path):
+                sys.exit(1)
             print(f"Automaticaly saved detailed report to: {auto_report_path}")
         except Exception as e:
             logger.error(f"Error during assessment: {e}")
@@ -0,0 +1,50 @@
+"""
+JSON读写工具
+orjson为可选依赖：安装后解析和序列化更快，未安装时使用标准库json，两种情况下的结果保持一致
+"""
+
+import json
+import math
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """解析JSON文本（str或bytes）
+
+    orjson不接受NaN/Infinity字面量（标准库json.dump默认会写出这些值），
+    解析失败时回退到标准库，真正的格式错误仍以json.JSONDecodeError抛出
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _finite_or_none(obj: Any) -> Any:
+    """递归地把NaN/Infinity替换为None，与orjson的输出保持一致"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite_or_none(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite_or_none(value) for value in obj]
+    return obj
+
+
+def json_dumps_bytes(data: Any) -> bytes:
+    """序列化为缩进2格的UTF-8 JSON字节串
+
+    orjson把NaN/Infinity写成null；标准库路径先做同样的替换，
+    保证报告内容不取决于是否安装了orjson，且始终是合法JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                            | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_finite_or_none(data), ensure_ascii=False, indent=2).encode('utf-8')
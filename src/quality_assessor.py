@@ -23,11 +23,13 @@ RULES_PATH = Path(__file__).parent / "quality_rules"
 
 class DungeonQualityAssessor:
     """Dungeon map quality assessor (plugin rule loading + spatial inference)"""
-    def __init__(self, rule_weights: Optional[Dict[str, float]] = None, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0):
+    def __init__(self, rule_weights: Optional[Dict[str, float]] = None, enable_spatial_inference: bool = True, adjacency_threshold: float = 1.0,
+                 adapter_manager: Optional[AdapterManager] = None):
         self.rules = self._load_rules()
         self.enable_spatial_inference = enable_spatial_inference
         self.adjacency_threshold = adjacency_threshold
-        self.adapter_manager = AdapterManager()
+        # 可复用调用方已有的AdapterManager，避免重复扫描并导入全部适配器模块
+        self.adapter_manager = adapter_manager if adapter_manager is not None else AdapterManager()
         
         # 重新设计权重系统：按类别分组，每个类别内部等权
         self.rule_weights = rule_weights or {
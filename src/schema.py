@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Dict, List, Any, Optional, Set, Tuple
 
 @dataclass
 class UnifiedDungeonFormat:
@@ -132,38 +133,28 @@ def identify_entrance_exit(dungeon_data: Dict[str, Any]) -> Dict[str, Any]:
     # 1.5. 检查game_elements中的入口出口
     game_elements = level.get('game_elements', [])
     if not entrance_room or not exit_room:
-        entrance_elements = [elem for elem in game_elements if elem.get('type') == 'entrance']
-        exit_elements = [elem for elem in game_elements if elem.get('type') == 'exit']
+        # 一次遍历同时取出第一个入口元素和第一个出口元素
+        entrance_elem = exit_elem = None
+        for elem in game_elements:
+            elem_type = elem.get('type')
+            if elem_type == 'entrance':
+                if entrance_elem is None:
+                    entrance_elem = elem
+            elif elem_type == 'exit':
+                if exit_elem is None:
+                    exit_elem = elem
         
-        if entrance_elements and not entrance_room:
+        if entrance_elem is not None and not entrance_room:
             # 找到离入口元素最近的房间
-            entrance_elem = entrance_elements[0]
             entrance_pos = entrance_elem.get('position', {})
             if entrance_pos:
-                ex, ey = entrance_pos.get('x', 0), entrance_pos.get('y', 0)
-                def get_room_center(room):
-                    pos = room.get('position', {})
-                    size = room.get('size', {})
-                    return pos.get('x', 0) + size.get('width', 0) / 2, pos.get('y', 0) + size.get('height', 0) / 2
-                
-                nearest_room = min(rooms, key=lambda r: 
-                    ((get_room_center(r)[0] - ex) ** 2 + (get_room_center(r)[1] - ey) ** 2) ** 0.5)
-                entrance_room = nearest_room['id']
+                entrance_room = _nearest_room(rooms, entrance_pos.get('x', 0), entrance_pos.get('y', 0))['id']
         
-        if exit_elements and not exit_room:
+        if exit_elem is not None and not exit_room:
             # 找到离出口元素最近的房间
-            exit_elem = exit_elements[0]
             exit_pos = exit_elem.get('position', {})
             if exit_pos:
-                ex, ey = exit_pos.get('x', 0), exit_pos.get('y', 0)
-                def get_room_center(room):
-                    pos = room.get('position', {})
-                    size = room.get('size', {})
-                    return pos.get('x', 0) + size.get('width', 0) / 2, pos.get('y', 0) + size.get('height', 0) / 2
-                
-                nearest_room = min(rooms, key=lambda r: 
-                    ((get_room_center(r)[0] - ex) ** 2 + (get_room_center(r)[1] - ey) ** 2) ** 0.5)
-                exit_room = nearest_room['id']
+                exit_room = _nearest_room(rooms, exit_pos.get('x', 0), exit_pos.get('y', 0))['id']
     
     # 2. 语义分析 - 优先识别boss房间作为exit
     if not exit_room:
@@ -219,9 +210,10 @@ def identify_entrance_exit(dungeon_data: Dict[str, Any]) -> Dict[str, Any]:
             # 按优先级排序
             sorted_boss_rooms = sorted(boss_rooms, key=boss_priority)
             
-            # 选择优先级最高且可达的boss房间
+            # 选择优先级最高且可达的boss房间（从入口BFS一次，之后只做集合查询）
+            reachable = _reachable_from(graph, entrance_room)
             for boss_room in sorted_boss_rooms:
-                if _is_reachable(graph, entrance_room, boss_room['id']):
+                if boss_room['id'] in reachable:
                     exit_room = boss_room['id']
                     break
     
@@ -245,37 +237,31 @@ def identify_entrance_exit(dungeon_data: Dict[str, Any]) -> Dict[str, Any]:
             if not exit_room:
                 exit_candidates = [r for r in connected_rooms if r['id'] != entrance_room]
                 if exit_candidates:
+                    reachable = _reachable_from(graph, entrance_room)
                     # 优先选择连接度为1的房间
                     degree_1_exits = [r for r in exit_candidates if len(graph[r['id']]) == 1]
                     if degree_1_exits:
                         # 检查可达性
                         for candidate in degree_1_exits:
-                            if _is_reachable(graph, entrance_room, candidate['id']):
+                            if candidate['id'] in reachable:
                                 exit_room = candidate['id']
                                 break
                     
                     # 如果没有可达的度为1的房间，选择连接度最低的可达房间
                     if not exit_room:
                         for candidate in sorted(exit_candidates, key=lambda r: len(graph[r['id']])):
-                            if _is_reachable(graph, entrance_room, candidate['id']):
+                            if candidate['id'] in reachable:
                                 exit_room = candidate['id']
                                 break
     
     # 4. 空间位置分析（如果拓扑分析失败）
     if not entrance_room or not exit_room:
-        def get_room_center(room):
-            pos = room.get('position', {})
-            size = room.get('size', {})
-            x = pos.get('x', 0) + size.get('width', 0) / 2
-            y = pos.get('y', 0) + size.get('height', 0) / 2
-            return x, y
-        
         # 只考虑有连接的房间
         connected_rooms = [room for room in rooms if len(graph[room['id']]) > 0]
         if len(connected_rooms) >= 2:
             room_centers = []
             for room in connected_rooms:
-                center = get_room_center(room)
+                center = _room_center(room)
                 room_centers.append({
                     'room_id': room['id'],
                     'center': center,
@@ -309,24 +295,31 @@ def identify_entrance_exit(dungeon_data: Dict[str, Any]) -> Dict[str, Any]:
     
     return dungeon_data
 
-def _is_reachable(graph: Dict[str, List[str]], start: str, end: str) -> bool:
+def _room_center(room: Dict[str, Any]) -> Tuple[float, float]:
+    """房间矩形的中心坐标"""
+    pos = room.get('position', {})
+    size = room.get('size', {})
+    return pos.get('x', 0) + size.get('width', 0) / 2, pos.get('y', 0) + size.get('height', 0) / 2
+
+def _nearest_room(rooms: List[Dict[str, Any]], x: float, y: float) -> Dict[str, Any]:
+    """离点(x, y)最近的房间（按中心点距离，每个房间只计算一次中心）"""
+    def distance(room):
+        cx, cy = _room_center(room)
+        return ((cx - x) ** 2 + (cy - y) ** 2) ** 0.5
+    return min(rooms, key=distance)
+
+def _reachable_from(graph: Dict[str, List[str]], start: str) -> Set[str]:
     """
-    检查两个节点是否可达（BFS）
+    返回从start出发可达的全部节点（BFS，包含start本身）
     """
-    if start == end:
-        return True
-    
-    visited = set()
-    queue = [start]
-    visited.add(start)
+    visited = {start}
+    queue = deque([start])
     
     while queue:
-        current = queue.pop(0)
+        current = queue.popleft()
         for neighbor in graph.get(current, []):
-            if neighbor == end:
-                return True
             if neighbor not in visited:
                 visited.add(neighbor)
                 queue.append(neighbor)
     
-    return False 
\ No newline at end of file
+    return visited 
\ No newline at end of file
@@ -4,12 +4,17 @@ PNG图表生成器 - 直接生成独立的PNG图片文件
 """
 
 import os
-import base64
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Any
 from unified_chart_generator import UnifiedChartGenerator
 
+try:
+    # pybase64为可选依赖，使用SIMD编解码；接口与标准库base64一致
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 class PNGChartGenerator:
     """PNG图表生成器 - 直接保存PNG文件"""
     
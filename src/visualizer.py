@@ -9,7 +9,7 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union, BinaryIO
 import json
 import os
 from pathlib import Path
@@ -25,6 +25,26 @@ plt.rcParams['axes.unicode_minus'] = False
 
 logger = logging.getLogger(__name__)
 
+# DND_TEST_FAST_PNG=1 lowers PNG compression for throwaway test renders; production keeps the libpng default
+FAST_PNG = os.environ.get('DND_TEST_FAST_PNG') == '1'
+
+
+def _is_file_path(output_path) -> bool:
+    """True for filesystem paths, False for binary file objects such as io.BytesIO"""
+    return isinstance(output_path, (str, os.PathLike))
+
+def _png_save_kwargs(output_path: Union[str, BinaryIO]) -> Dict[str, Any]:
+    """Extra savefig kwargs: file objects are written as PNG (fast compression when DND_TEST_FAST_PNG=1)"""
+    kwargs = {}
+    if _is_file_path(output_path):
+        is_png = str(output_path).lower().endswith('.png')
+    else:
+        kwargs['format'] = 'png'
+        is_png = True
+    if FAST_PNG and is_png:
+        kwargs['pil_kwargs'] = {'compress_level': 1}
+    return kwargs
+
 class DungeonVisualizer:
     """Dungeon visualizer"""
     def __init__(self, figsize: Tuple[int, int] = (12, 8), dpi: int = 100):
@@ -60,7 +80,7 @@ class DungeonVisualizer:
             'exit': 'OUT'         # Exit symbol
         }
 
-    def visualize_dungeon(self, dungeon_data: Dict[str, Any], output_path: str, 
+    def visualize_dungeon(self, dungeon_data: Dict[str, Any], output_path: Union[str, BinaryIO], 
                          show_connections: bool = True, show_room_ids: bool = True,
                          show_grid: bool = True, show_game_elements: bool = True) -> bool:
         """
@@ -120,11 +140,12 @@ class DungeonVisualizer:
             self._add_legend(ax, show_game_elements)
             
             # 确保输出目录存在
-            output_dir = os.path.dirname(output_path)
+            output_dir = os.path.dirname(output_path) if _is_file_path(output_path) else ''
             if output_dir:  # 只有当目录不为空时才创建
                 os.makedirs(output_dir, exist_ok=True)
             
-            plt.savefig(output_path, dpi=self.dpi, bbox_inches='tight', facecolor='white', edgecolor='none')
+            plt.savefig(output_path, dpi=self.dpi, bbox_inches='tight', facecolor='white', edgecolor='none',
+                        **_png_save_kwargs(output_path))
             plt.close()
             logger.info(f"Dungeon Saved To: {output_path}")
             return True
@@ -479,7 +500,7 @@ class DungeonVisualizer:
         
         return False
 
-    def _visualize_edgar_dungeon(self, dungeon_data: Dict[str, Any], output_path: str,
+    def _visualize_edgar_dungeon(self, dungeon_data: Dict[str, Any], output_path: Union[str, BinaryIO],
                                show_connections: bool, show_room_ids: bool,
                                show_grid: bool, show_game_elements: bool) -> bool:
         """Edgar风格的地牢可视化"""
@@ -536,7 +557,7 @@ class DungeonVisualizer:
             # 保存图像
             plt.tight_layout()
             plt.savefig(output_path, dpi=self.dpi, bbox_inches='tight', 
-                       facecolor=colors['background'], edgecolor='none')
+                       facecolor=colors['background'], edgecolor='none', **_png_save_kwargs(output_path))
             plt.close()
             
             logger.info(f"Edgar地牢已保存到: {output_path}")
@@ -983,22 +1004,21 @@ class DungeonVisualizer:
                         'connection_type': 'physical'
                     })
             
-            # 基于连接关系生成通道
+            # 基于连接关系生成通道：房间按id建索引（重复id时与线性查找一样取最后一个），
+            # 已有通道的端点放入集合用于去重
+            room_by_id = {room['id']: room for room in rooms}
+            corridor_endpoints = {
+                (c['start']['x'], c['start']['y'], c['end']['x'], c['end']['y'])
+                for c in frontend_corridors
+            }
             for connection in connections:
                 from_room_id = connection.get('from_room')
                 to_room_id = connection.get('to_room')
                 
                 if from_room_id and to_room_id:
-                    # 查找对应的房间
-                    from_room = None
-                    to_room = None
-                    
-                    # 在房间数组中查找
-                    for room in rooms:
-                        if room['id'] == from_room_id:
-                            from_room = room
-                        elif room['id'] == to_room_id:
-                            to_room = room
+                    # 查找对应的房间（起止为同一房间时按原逻辑视为未找到终点）
+                    from_room = room_by_id.get(from_room_id)
+                    to_room = room_by_id.get(to_room_id) if to_room_id != from_room_id else None
                     
                     if from_room and to_room:
                         # 计算房间中心点
@@ -1021,16 +1041,9 @@ class DungeonVisualizer:
                         corridor_id = f'connection_{from_room_id}_{to_room_id}'
                         
                         # 检查是否已存在相同的连接
-                        existing_connection = False
-                        for existing_corridor in frontend_corridors:
-                            if (existing_corridor['start']['x'] == from_center_x and 
-                                existing_corridor['start']['y'] == from_center_y and
-                                existing_corridor['end']['x'] == to_center_x and 
-                                existing_corridor['end']['y'] == to_center_y):
-                                existing_connection = True
-                                break
-                        
-                        if not existing_connection:
+                        endpoints = (from_center_x, from_center_y, to_center_x, to_center_y)
+                        if endpoints not in corridor_endpoints:
+                            corridor_endpoints.add(endpoints)
                             frontend_corridors.append({
                                 'id': corridor_id,
                                 'start': {'x': from_center_x, 'y': from_center_y},
@@ -1040,19 +1053,12 @@ class DungeonVisualizer:
                                 'connection_type': 'room_to_room'
                             })
             
-            # 计算地图边界
-            min_x = min([room['x'] for room in frontend_rooms]) if frontend_rooms else 0
-            max_x = max([room['x'] + room['width'] for room in frontend_rooms]) if frontend_rooms else 800
-            min_y = min([room['y'] for room in frontend_rooms]) if frontend_rooms else 0
-            max_y = max([room['y'] + room['height'] for room in frontend_rooms]) if frontend_rooms else 600
-            
-            if frontend_corridors:
-                corridor_xs = [c['start']['x'] for c in frontend_corridors] + [c['end']['x'] for c in frontend_corridors]
-                corridor_ys = [c['start']['y'] for c in frontend_corridors] + [c['end']['y'] for c in frontend_corridors]
-                min_x = min(min_x, min(corridor_xs))
-                max_x = max(max_x, max(corridor_xs))
-                min_y = min(min_y, min(corridor_ys))
-                max_y = max(max_y, max(corridor_ys))
+            # 计算地图边界：房间左上/右下角与通道端点堆叠成(N, 2)数组，按列一次求min/max
+            lows = [(room['x'], room['y']) for room in frontend_rooms] or [(0, 0)]
+            highs = [(room['x'] + room['width'], room['y'] + room['height']) for room in frontend_rooms] or [(800, 600)]
+            corridor_points = [(p['x'], p['y']) for c in frontend_corridors for p in (c['start'], c['end'])]
+            min_x, min_y = np.min(np.array(lows + corridor_points), axis=0).tolist()
+            max_x, max_y = np.max(np.array(highs + corridor_points), axis=0).tolist()
             
             return {
                 'rooms': frontend_rooms,
@@ -1101,7 +1107,7 @@ class DungeonVisualizer:
         }
 
 # ====== 便捷入口函数 ======
-def visualize_dungeon(dungeon_data: Dict[str, Any], output_path: str, 
+def visualize_dungeon(dungeon_data: Dict[str, Any], output_path: Union[str, BinaryIO], 
                      figsize: Tuple[int, int] = (12, 8), dpi: int = 100,
                      show_connections: bool = True, show_room_ids: bool = True,
                      show_grid: bool = True, show_game_elements: bool = True) -> bool:
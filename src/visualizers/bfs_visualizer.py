@@ -575,38 +575,45 @@ class BFSVisualizer:
             return 1
         
         # 使用BFS找到最短路径长度
-        visited = set()
-        queue = deque([(start, 0)])
-        visited.add(start)
+        # 距离单独存放，队列只保存节点；每个节点至多入队一次，用列表加读指针代替deque
+        dist = {start: 0}
+        queue = [start]
+        head = 0
         shortest_length = None
         
-        while queue:
-            curr, length = queue.popleft()
+        while head < len(queue):
+            curr = queue[head]
+            head += 1
             if curr == end:
-                shortest_length = length
+                shortest_length = dist[curr]
                 break
+            next_dist = dist[curr] + 1
             for nb in self.graph[curr]:
-                if nb not in visited:
-                    visited.add(nb)
-                    queue.append((nb, length + 1))
+                if nb not in dist:
+                    dist[nb] = next_dist
+                    queue.append(nb)
         
         if shortest_length is None:
             return 0  # 不可达
         
-        # 计算最短路径的数量
-        def count_paths_with_length(curr, target, remaining_length, visited):
+        # 计算最短路径的数量：共用一个visited集合，递归前加入、返回前移除（回溯）
+        path_visited = set()
+        
+        def count_paths_with_length(curr, remaining_length):
             if remaining_length == 0:
-                return 1 if curr == target else 0
+                return 1 if curr == end else 0
             if remaining_length < 0:
                 return 0
             
             count = 0
+            path_visited.add(curr)
             for nb in self.graph[curr]:
-                if nb not in visited:
-                    count += count_paths_with_length(nb, target, remaining_length - 1, visited | {curr})
+                if nb not in path_visited:
+                    count += count_paths_with_length(nb, remaining_length - 1)
+            path_visited.remove(curr)
             return count
         
-        return count_paths_with_length(start, end, shortest_length, set())
+        return count_paths_with_length(start, shortest_length)
     
     def create_interactive_window(self):
         """创建交互式窗口"""
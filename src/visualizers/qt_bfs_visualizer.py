@@ -8,12 +8,14 @@ Qt版本的BFS算法可视化器
 import sys
 import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple, Set
-from collections import deque
+from typing import Dict, List, Any, Optional, Tuple, Set, Iterator
+from collections import Counter, deque
+from dataclasses import dataclass, field
 import time
 import threading
 from pathlib import Path
 
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QComboBox, QSlider, QSpinBox, QTextEdit,
@@ -22,15 +24,350 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import (
     Qt, QTimer, pyqtSignal, QThread, QPropertyAnimation, QEasingCurve,
-    QRect, QPoint, QSize
+    QRect, QRectF, QPoint, QSize, QLineF
 )
 from PyQt5.QtGui import (
-    QPainter, QPen, QBrush, QColor, QFont, QPixmap, QPainterPath,
+    QPainter, QPen, QBrush, QColor, QFont, QImage, QPixmap, QPainterPath,
     QLinearGradient, QRadialGradient
 )
 
+try:
+    # orjson为可选依赖，解析大文件更快；未安装时回退到标准库（两者都接受bytes）
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    # ijson为可选依赖，用于流式解析大文件，只保留可视化需要的字段
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # numba为可选依赖，安装后最短路径计数在编译后的循环中执行
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
 logger = logging.getLogger(__name__)
 
+# 超过该大小的文件在安装了ijson时使用流式解析
+STREAM_PARSE_MIN_BYTES = 1 << 20
+
+# 节点数不超过该值时用稠密矩阵乘法批量计算最短路径条数
+DENSE_PATH_COUNT_MAX_NODES = 256
+
+def _bfs_path_counts_kernel(indptr, indices, src, n):
+    """CSR上的单源BFS最短路径计数，队列为预分配数组（head/tail下标）
+    
+    路径条数随图规模指数增长，用float64计数避免整数溢出回绕
+    """
+    dist = np.full(n, -1, dtype=np.int64)
+    cnt = np.zeros(n, dtype=np.float64)
+    queue = np.empty(n, dtype=np.int32)
+    dist[src] = 0
+    cnt[src] = 1
+    queue[0] = src
+    head, tail = 0, 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        next_dist = dist[u] + 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if dist[v] == -1:
+                dist[v] = next_dist
+                cnt[v] = cnt[u]
+                queue[tail] = v
+                tail += 1
+            elif dist[v] == next_dist:
+                cnt[v] += cnt[u]
+    return dist, cnt
+
+
+def _pairwise_path_counts_kernel(indptr, indices, sources, n):
+    """以每个源点各做一次BFS，源点之间相互独立，按行并行"""
+    m = sources.shape[0]
+    counts = np.zeros((m, m), dtype=np.float64)
+    for row in prange(m):
+        dist, cnt = _bfs_path_counts_kernel(indptr, indices, sources[row], n)
+        for col in range(m):
+            if dist[sources[col]] >= 0:
+                counts[row, col] = cnt[sources[col]]
+    return counts
+
+
+if njit is not None:
+    _bfs_path_counts_kernel = njit(cache=True)(_bfs_path_counts_kernel)
+    _pairwise_path_counts_kernel = njit(parallel=True, cache=True)(_pairwise_path_counts_kernel)
+
+# 节点可视化状态，数值越大优先级越高
+(NODE_UNVISITED, NODE_QUEUE, NODE_VISITED, NODE_PATH,
+ NODE_CURRENT, NODE_END, NODE_START) = range(7)
+
+
+@dataclass
+class GraphCSR:
+    """CSR压缩邻接表：节点i的邻居为 indices[indptr[i]:indptr[i+1]]"""
+    indptr: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int32))
+    indices: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    idx_to_id: List[str] = field(default_factory=list)
+    id_to_idx: Dict[str, int] = field(default_factory=dict)
+    _adjacency: Optional[List[List[int]]] = field(default=None, init=False, repr=False)
+    _neighbor_bits: Optional[List[int]] = field(default=None, init=False, repr=False)
+    
+    @classmethod
+    def from_adjacency(cls, graph: Dict[str, List[str]]) -> 'GraphCSR':
+        """由邻接表字典构建CSR"""
+        idx_to_id = list(graph)
+        id_to_idx = {node_id: i for i, node_id in enumerate(idx_to_id)}
+        indptr = np.zeros(len(idx_to_id) + 1, dtype=np.int32)
+        np.cumsum([len(graph[node_id]) for node_id in idx_to_id], out=indptr[1:])
+        indices = np.fromiter(
+            (id_to_idx[nb] for node_id in idx_to_id for nb in graph[node_id]),
+            dtype=np.int32, count=int(indptr[-1])
+        )
+        return cls(indptr, indices, idx_to_id, id_to_idx)
+    
+    def __len__(self) -> int:
+        return len(self.idx_to_id)
+    
+    @property
+    def adjacency(self) -> List[List[int]]:
+        """按节点下标组织的邻居列表，首次访问时构建，供纯Python遍历使用"""
+        if self._adjacency is None:
+            indptr = self.indptr.tolist()
+            indices = self.indices.tolist()
+            self._adjacency = [indices[indptr[i]:indptr[i + 1]] for i in range(len(self))]
+        return self._adjacency
+    
+    @property
+    def neighbor_bits(self) -> List[int]:
+        """按节点下标组织的邻居位掩码：第u项的第v位为1当且仅当(u, v)是边"""
+        if self._neighbor_bits is None:
+            masks = []
+            for nbs in self.adjacency:
+                mask = 0
+                for v in nbs:
+                    mask |= 1 << v
+                masks.append(mask)
+            self._neighbor_bits = masks
+        return self._neighbor_bits
+    
+    def shortest_path(self, src: int, dst: int) -> Optional[List[int]]:
+        """双向BFS，返回src到dst的一条最短路径（节点下标），不可达返回None
+        
+        图是无向的，两端共用邻接表；每轮只扩展较小的一侧前沿一整层，
+        新发现的节点若已被另一侧访问即为相遇点，此时路径长度必为最短。
+        """
+        if src == dst:
+            return [src]
+        adj = self.adjacency
+        # -2: 未发现，-1: 根
+        fwd_parent = [-2] * len(self)
+        bwd_parent = [-2] * len(self)
+        fwd_parent[src] = -1
+        bwd_parent[dst] = -1
+        fwd, bwd = [src], [dst]
+        meet = -1
+        while fwd and bwd and meet == -1:
+            forward = len(fwd) <= len(bwd)
+            frontier, parent, other = (
+                (fwd, fwd_parent, bwd_parent) if forward else (bwd, bwd_parent, fwd_parent)
+            )
+            next_frontier = []
+            for u in frontier:
+                for v in adj[u]:
+                    if parent[v] == -2:
+                        parent[v] = u
+                        if other[v] != -2:
+                            meet = v
+                            break
+                        next_frontier.append(v)
+                if meet != -1:
+                    break
+            if forward:
+                fwd = next_frontier
+            else:
+                bwd = next_frontier
+        if meet == -1:
+            return None
+        
+        path = []
+        node = meet
+        while node != -1:
+            path.append(node)
+            node = fwd_parent[node]
+        path.reverse()
+        node = bwd_parent[meet]
+        while node != -1:
+            path.append(node)
+            node = bwd_parent[node]
+        return path
+    
+    def shortest_path_dag(self, src: int) -> Tuple[List[int], List[List[int]]]:
+        """完整的单源BFS，返回到各节点的距离（不可达为-1）及最短路径前驱DAG
+        
+        preds[v]为所有满足 dist[u] + 1 == dist[v] 的邻居u，src到任意节点的所有最短路径都可由它回溯得到。
+        """
+        adj = self.adjacency
+        dist = [-1] * len(self)
+        preds: List[List[int]] = [[] for _ in range(len(self))]
+        dist[src] = 0
+        # 每个节点至多入队一次，用列表加读指针代替deque
+        queue = [src]
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            next_dist = dist[u] + 1
+            for v in adj[u]:
+                if dist[v] == -1:
+                    dist[v] = next_dist
+                    preds[v].append(u)
+                    queue.append(v)
+                elif dist[v] == next_dist:
+                    preds[v].append(u)
+        return dist, preds
+    
+    @staticmethod
+    def iter_dag_paths(preds: List[List[int]], src: int, dst: int) -> Iterator[List[int]]:
+        """从dst沿前驱DAG回溯到src，逐条生成所有最短路径（dst须可达）
+        
+        栈中每层保存一个前驱迭代器，path[i]为第i层所在节点（dst在前）。
+        """
+        if src == dst:
+            yield [src]
+            return
+        path = [dst]
+        stack = [iter(preds[dst])]
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                stack.pop()
+                path.pop()
+            elif nxt == src:
+                yield [src] + path[::-1]
+            else:
+                path.append(nxt)
+                stack.append(iter(preds[nxt]))
+    
+    def shortest_path_counts(self, src: int) -> Tuple[np.ndarray, np.ndarray]:
+        """单源BFS，同时按 cnt[v] += cnt[u] 递推最短路径条数
+        
+        Returns:
+            (dist, cnt)：到各节点的最短距离（不可达为-1）及最短路径条数（float64）
+        """
+        if njit is not None:
+            return _bfs_path_counts_kernel(self.indptr, self.indices, src, len(self))
+        
+        adj = self.adjacency
+        dist = [-1] * len(self)
+        cnt = [0] * len(self)
+        dist[src] = 0
+        cnt[src] = 1
+        # 每个节点至多入队一次，用列表加读指针代替deque
+        queue = [src]
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            next_dist = dist[u] + 1
+            for v in adj[u]:
+                if dist[v] == -1:
+                    dist[v] = next_dist
+                    cnt[v] = cnt[u]
+                    queue.append(v)
+                elif dist[v] == next_dist:
+                    cnt[v] += cnt[u]
+        return np.array(dist, dtype=np.int64), np.array(cnt, dtype=np.float64)
+    
+    def pairwise_path_counts(self, sources: List[int]) -> np.ndarray:
+        """计算sources两两之间的最短路径条数矩阵（float64，不可达为0）
+        
+        安装了numba时各源点的BFS在编译后的内核中并行执行；否则小图把多源BFS写成矩阵乘法：
+        第k步 R = C @ A，距离恰为k的位置即 R > 0 且尚未到达，C只保留这些位置作为下一层；
+        大图逐个源点做BFS递推。
+        """
+        n = len(self)
+        if njit is not None:
+            return _pairwise_path_counts_kernel(
+                self.indptr, self.indices, np.asarray(sources, dtype=np.int32), n
+            )
+
+        src_idx = np.asarray(sources, dtype=np.intp)
+        if n > DENSE_PATH_COUNT_MAX_NODES:
+            counts = np.zeros((len(sources), len(sources)), dtype=np.float64)
+            for row, src in enumerate(sources):
+                dist, cnt = self.shortest_path_counts(src)
+                counts[row] = np.where(dist[src_idx] >= 0, cnt[src_idx], 0.0)
+            return counts
+        
+        # 浮点矩阵走BLAS，2^53以内的路径条数可精确表示
+        adj = np.zeros((n, n), dtype=np.float64)
+        rows = np.repeat(np.arange(n), np.diff(self.indptr))
+        np.add.at(adj, (rows, self.indices), 1.0)
+        
+        current = np.zeros((len(sources), n), dtype=np.float64)
+        current[np.arange(len(sources)), src_idx] = 1.0
+        reached = current > 0
+        counts = current.copy()
+        while True:
+            step = current @ adj
+            frontier = (step > 0) & ~reached
+            if not frontier.any():
+                break
+            reached |= frontier
+            current = np.where(frontier, step, 0.0)
+            counts += current
+        return counts[:, src_idx]
+    
+    def reachable_bits(self, start: int) -> int:
+        """位集BFS：前沿与已访问集合都用Python整数表示，返回可达节点的位掩码"""
+        masks = self.neighbor_bits
+        frontier = visited = 1 << start
+        while frontier:
+            reached = 0
+            while frontier:
+                low = frontier & -frontier
+                reached |= masks[low.bit_length() - 1]
+                frontier ^= low
+            frontier = reached & ~visited
+            visited |= frontier
+        return visited
+
+
+def _iload_dungeon(file_path: str) -> Dict[str, Any]:
+    """流式解析地牢文件，只提取第一层的房间/走廊/连接或plan_graph邻接数据"""
+    with open(file_path, 'rb') as f:
+        level = next(ijson.items(f, 'levels.item', use_float=True), None)
+    if level:
+        keep = ('rooms', 'corridors', 'connections')
+        return {'levels': [{key: level[key] for key in keep if key in level}]}
+    
+    with open(file_path, 'rb') as f:
+        weight_data = next(ijson.items(
+            f, 'plan_graph.graph.weight_per_neighbor_per_vertex', use_float=True
+        ), None)
+    if weight_data is None:
+        return {}
+    return {'plan_graph': {'graph': {'weight_per_neighbor_per_vertex': weight_data}}}
+
+
+def load_dungeon_json(file_path: str) -> Dict[str, Any]:
+    """读取地牢文件，大文件优先流式解析以降低峰值内存"""
+    if ijson is not None and Path(file_path).stat().st_size >= STREAM_PARSE_MIN_BYTES:
+        return _iload_dungeon(file_path)
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        return _json_loads(raw)
+    except ValueError:
+        # orjson不接受NaN/Infinity字面量（标准库可以解析），此时回退到标准库
+        return json.loads(raw)
+
+
 class DungeonCanvas(QWidget):
     """地牢绘制画布"""
     
@@ -38,9 +375,26 @@ class DungeonCanvas(QWidget):
         super().__init__(parent)
         self.dungeon_data = None
         self.graph = {}
+        self.csr = GraphCSR()  # 图的CSR形式，供遍历算法使用
         self.node_positions = {}
         self.node_sizes = {}
         self.node_types = {}
+        self._edge_lines = []  # 预先构建的连接线，数据加载时刷新
+        self._room_draw: List[Tuple[str, QRect]] = []      # 房间绘制矩形
+        self._corridor_draw: List[Tuple[str, QRect]] = []  # 走廊绘制矩形
+        self._font_for_node: Dict[str, Tuple[QFont, QFont]] = {}  # 标签字体（常规, 加粗）
+        self._label_info: Dict[str, Tuple[QRect, str]] = {}  # 标签区域和文字
+        
+        # 静态图层缓存（连接线、节点轮廓、标签），按场景坐标绘制，平移时只需改变贴图位置
+        self._static_cache: Optional[QImage] = None
+        self._static_origin = QPoint(0, 0)  # 缓存左上角相对pan_offset的像素偏移
+        self._cache_key = None
+        self._scene_rect = QRectF()  # 所有节点绘制区域的并集（场景坐标）
+        
+        # 节点索引及状态数组，每个节点一个NODE_*状态
+        self._node_ids: List[str] = []
+        self._node_idx: Dict[str, int] = {}
+        self._state = np.zeros(0, dtype=np.int8)
         
         # 可视化状态
         self.visited_nodes = set()
@@ -67,15 +421,25 @@ class DungeonCanvas(QWidget):
             'background': QColor(250, 250, 250),     # 背景
             'text': QColor(33, 33, 33)               # 文字
         }
+        self._color_by_state = [
+            self.colors['unvisited'], self.colors['queue'], self.colors['visited'],
+            self.colors['path'], self.colors['current'], self.colors['end'],
+            self.colors['start'],
+        ]
         
         # 缩放和平移
         self.scale_factor = 1.0
         self.pan_offset = QPoint(0, 0)
         self.last_pan_point = None
         
+        # 交互重绘合并：每轮事件循环最多重绘一次
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(0)
+        self._repaint_timer.timeout.connect(self.update)
+        
         # 设置画布属性
         self.setMinimumSize(600, 400)
-        self.setMouseTracking(True)
         self.setFocusPolicy(Qt.StrongFocus)
         
     def load_dungeon_data(self, dungeon_data: Dict[str, Any]) -> bool:
@@ -83,15 +447,23 @@ class DungeonCanvas(QWidget):
         try:
             self.dungeon_data = dungeon_data
             self.graph = self._build_graph(dungeon_data)
+            self.csr = GraphCSR.from_adjacency(self.graph)
             self.node_positions = self._calculate_node_positions(dungeon_data)
             self.node_sizes = self._calculate_node_sizes(dungeon_data)
             self.node_types = self._get_node_types(dungeon_data)
+            self._edge_lines = self._build_edge_lines(dungeon_data)
+            self._build_node_rects()
+            self._build_label_fonts()
+            self._static_cache = None
             
             # 重置可视化状态
-            self.visited_nodes.clear()
+            self._node_ids = list(self.node_positions)
+            self._node_idx = {node_id: i for i, node_id in enumerate(self._node_ids)}
+            self._state = np.zeros(len(self._node_ids), dtype=np.int8)
+            self.visited_nodes = set()
             self.current_node = None
-            self.queue_nodes.clear()
-            self.path_nodes.clear()
+            self.queue_nodes = set()
+            self.path_nodes = []
             self.start_node = None
             self.end_node = None
             
@@ -117,13 +489,17 @@ class DungeonCanvas(QWidget):
             connections = level.get('connections', [])
             
             all_nodes = rooms + corridors
-            for node in all_nodes:
-                graph[node['id']] = []
-                
+            graph = {node['id']: [] for node in all_nodes}
+            
+            # 每条边只查一次两端的邻接表
             for conn in connections:
-                if conn['from_room'] in graph and conn['to_room'] in graph:
-                    graph[conn['from_room']].append(conn['to_room'])
-                    graph[conn['to_room']].append(conn['from_room'])
+                from_id = conn['from_room']
+                to_id = conn['to_room']
+                from_neighbors = graph.get(from_id)
+                to_neighbors = graph.get(to_id)
+                if from_neighbors is not None and to_neighbors is not None:
+                    from_neighbors.append(to_id)
+                    to_neighbors.append(from_id)
         
         elif 'plan_graph' in dungeon_data:
             # FiMap Elites格式
@@ -131,14 +507,17 @@ class DungeonCanvas(QWidget):
             graph_data = plan_graph.get('graph', {})
             weight_data = graph_data.get('weight_per_neighbor_per_vertex', {})
             
+            # 每条无向边在两端的邻居表中各出现一次，按规范化端点对去重
+            seen_edges = set()
             for vertex, neighbors in weight_data.items():
-                if vertex not in graph:
-                    graph[vertex] = []
+                graph.setdefault(vertex, [])
                 for neighbor in neighbors.keys():
-                    if neighbor not in graph:
-                        graph[neighbor] = []
+                    edge = (vertex, neighbor) if vertex < neighbor else (neighbor, vertex)
+                    if edge in seen_edges:
+                        continue
+                    seen_edges.add(edge)
                     graph[vertex].append(neighbor)
-                    graph[neighbor].append(vertex)
+                    graph.setdefault(neighbor, []).append(vertex)
         
         return graph
     
@@ -171,27 +550,71 @@ class DungeonCanvas(QWidget):
                 row = i // grid_size
                 col = i % grid_size
                 raw_positions[node_id] = (col, row)
-        # 归一化到画布范围
+        # 归一化到画布范围（向量化计算）
         if not raw_positions:
             return positions
-        xs = [p[0] for p in raw_positions.values()]
-        ys = [p[1] for p in raw_positions.values()]
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
-        # 防止除零
-        x_span = x_max - x_min if x_max > x_min else 1
-        y_span = y_max - y_min if y_max > y_min else 1
+        coords = np.array(list(raw_positions.values()), dtype=np.float64)
+        coords_min = coords.min(axis=0)
+        span = coords.max(axis=0) - coords_min
+        span[span <= 0] = 1  # 防止除零
         margin = 60
         canvas_width = max(self.width(), 600)
         canvas_height = max(self.height(), 400)
-        for node_id, (x, y) in raw_positions.items():
-            norm_x = (x - x_min) / x_span
-            norm_y = (y - y_min) / y_span
-            canvas_x = margin + norm_x * (canvas_width - 2 * margin)
-            canvas_y = margin + norm_y * (canvas_height - 2 * margin)
-            positions[node_id] = QPoint(int(canvas_x), int(canvas_y))
+        extent = np.array([canvas_width - 2 * margin, canvas_height - 2 * margin], dtype=np.float64)
+        pixels = (margin + (coords - coords_min) / span * extent).astype(np.int64)
+        for node_id, (px, py) in zip(raw_positions, pixels.tolist()):
+            positions[node_id] = QPoint(px, py)
         return positions
     
+    def _build_edge_lines(self, dungeon_data: Dict[str, Any]) -> List[QLineF]:
+        """根据连接关系和节点位置预先构建连接线"""
+        levels = dungeon_data.get('levels', [])
+        if not levels:
+            return []
+        positions = self.node_positions
+        lines = []
+        for conn in levels[0].get('connections', []):
+            from_pos = positions.get(conn['from_room'])
+            to_pos = positions.get(conn['to_room'])
+            if from_pos is not None and to_pos is not None:
+                lines.append(QLineF(from_pos, to_pos))
+        return lines
+    
+    def _build_node_rects(self):
+        """按节点类型预先计算绘制矩形，并缓存标签区域和文字"""
+        self._room_draw = []
+        self._corridor_draw = []
+        self._label_info = {}
+        bounds = QRect()
+        for node_id, pos in self.node_positions.items():
+            size = self.node_sizes.get(node_id, QSize(20, 20))
+            rect = QRect(pos.x() - size.width()//2, pos.y() - size.height()//2,
+                         size.width(), size.height())
+            bounds = bounds.united(rect)
+            self._label_info[node_id] = (rect, node_id[-3:] if len(node_id) > 3 else node_id)
+            if self.node_types.get(node_id, 'room') == 'room':
+                self._room_draw.append((node_id, rect))
+            else:
+                self._corridor_draw.append((node_id, rect))
+        # 连接线端点都在节点中心，节点区域再留出边框线宽即可覆盖全部静态内容
+        self._scene_rect = QRectF(bounds).adjusted(-4, -4, 4, 4) if not bounds.isNull() else QRectF()
+    
+    def _build_label_fonts(self):
+        """按节点尺寸预先创建标签字体，相同尺寸的节点共用一组字体"""
+        fonts_by_size = {}
+        self._font_for_node = {}
+        for node_id in self.node_positions:
+            size = self.node_sizes.get(node_id, QSize(20, 20))
+            key = (size.width(), size.height())
+            fonts = fonts_by_size.get(key)
+            if fonts is None:
+                font_size = max(8, min(key) // 2)
+                regular = QFont('Arial', font_size)
+                bold = QFont('Arial', font_size)
+                bold.setBold(True)
+                fonts = fonts_by_size[key] = (regular, bold)
+            self._font_for_node[node_id] = fonts
+    
     def _calculate_node_sizes(self, dungeon_data: Dict[str, Any]) -> Dict[str, QSize]:
         """节点大小自适应，节点多时变小，少时变大"""
         sizes = {}
@@ -283,144 +706,161 @@ class DungeonCanvas(QWidget):
             )
     
     def paintEvent(self, event):
-        """绘制事件"""
+        """绘制事件：先贴静态图层缓存，再只重绘状态发生变化的节点"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.TextAntialiasing)
-        
-        # 绘制背景
-        painter.fillRect(self.rect(), self.colors['background'])
         
         if not self.dungeon_data:
-            # 绘制提示信息
+            # 绘制背景和提示信息
+            painter.fillRect(self.rect(), self.colors['background'])
+            painter.setRenderHint(QPainter.TextAntialiasing)
             painter.setPen(self.colors['text'])
             painter.setFont(QFont('Arial', 14))
             painter.drawText(self.rect(), Qt.AlignCenter, "Please upload dungeon data")
             return
         
+        # 缓存只与缩放和窗口大小有关，平移时直接把缓存贴到新的位置
+        painter.fillRect(self.rect(), self.colors['background'])
+        key = (self.scale_factor, self.width(), self.height())
+        if self._static_cache is None or self._cache_key != key:
+            self._static_cache = self._render_static_layer()
+            self._cache_key = key
+        if not self._static_cache.isNull():
+            painter.drawImage(self.pan_offset + self._static_origin, self._static_cache)
+        
         # 应用变换
         painter.translate(self.pan_offset)
         painter.scale(self.scale_factor, self.scale_factor)
         
-        # 绘制连接线
-        self._draw_connections(painter)
-        
-        # 绘制节点
-        self._draw_nodes(painter)
+        # 只绘制有状态的节点及其标签
+        highlighted = self._highlighted_nodes()
+        self._draw_nodes(painter, highlighted)
+        self._draw_node_labels(painter, highlighted)
+    
+    def _render_static_layer(self) -> QImage:
+        """把连接线、未访问状态的节点和标签按场景坐标绘制到缓存中（不含平移）"""
+        if self._scene_rect.isEmpty():
+            return QImage()
+        scaled = QRectF(self._scene_rect.topLeft() * self.scale_factor,
+                        self._scene_rect.size() * self.scale_factor).toAlignedRect()
+        self._static_origin = scaled.topLeft()
+        
+        ratio = self.devicePixelRatioF()
+        cache = QImage(scaled.size() * ratio, QImage.Format_ARGB32_Premultiplied)
+        cache.setDevicePixelRatio(ratio)
+        cache.fill(self.colors['background'])
+        
+        painter = QPainter(cache)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-self._static_origin)
+        painter.scale(self.scale_factor, self.scale_factor)
         
-        # 绘制节点标签
-        self._draw_node_labels(painter)
+        self._draw_connections(painter)
+        self._draw_nodes(painter, fill=self.colors['unvisited'])
+        self._draw_node_labels(painter, highlight=False)
+        painter.end()
+        return cache
+    
+    def _highlighted_nodes(self) -> Set[str]:
+        """获取需要在静态图层之上重绘的节点"""
+        return {self._node_ids[i] for i in np.flatnonzero(self._state)}
     
     def _draw_connections(self, painter: QPainter):
         """绘制连接线"""
-        if not self.dungeon_data:
+        if not self._edge_lines:
             return
             
-        levels = self.dungeon_data.get('levels', [])
-        if levels:
-            level = levels[0]
-            connections = level.get('connections', [])
-            
-            pen = QPen(self.colors['connection'])
-            pen.setWidth(2)
-            painter.setPen(pen)
-            
-            for conn in connections:
-                from_id = conn['from_room']
-                to_id = conn['to_room']
-                
-                if from_id in self.node_positions and to_id in self.node_positions:
-                    from_pos = self.node_positions[from_id]
-                    to_pos = self.node_positions[to_id]
-                    painter.drawLine(from_pos, to_pos)
-    
-    def _draw_nodes(self, painter: QPainter):
-        """绘制节点"""
-        for node_id, pos in self.node_positions.items():
-            # 确定节点颜色
-            color = self._get_node_color(node_id)
-            
-            # 确定节点大小
-            size = self.node_sizes.get(node_id, QSize(20, 20))
-            node_type = self.node_types.get(node_id, 'room')
-            
-            # 绘制节点
-            if node_type == 'room':
-                self._draw_room(painter, pos, size, color)
-            else:
-                self._draw_corridor(painter, pos, size, color)
-    
-    def _get_node_color(self, node_id: str) -> QColor:
-        """获取节点颜色"""
-        if node_id == self.start_node:
-            return self.colors['start']
-        elif node_id == self.end_node:
-            return self.colors['end']
-        elif node_id == self.current_node:
-            return self.colors['current']
-        elif node_id in self.path_nodes:
-            return self.colors['path']
-        elif node_id in self.visited_nodes:
-            return self.colors['visited']
-        elif node_id in self.queue_nodes:
-            return self.colors['queue']
-        else:
-            return self.colors['unvisited']
+        pen = QPen(self.colors['connection'])
+        pen.setWidth(2)
+        painter.setPen(pen)
+        painter.drawLines(self._edge_lines)
     
-    def _draw_room(self, painter: QPainter, pos: QPoint, size: QSize, color: QColor):
-        """绘制房间"""
-        rect = QRect(pos.x() - size.width()//2, pos.y() - size.height()//2, 
-                    size.width(), size.height())
-        
-        # 绘制填充
-        painter.setBrush(QBrush(color))
+    def _draw_nodes(self, painter: QPainter, node_ids: Optional[Set[str]] = None,
+                    fill: Optional[QColor] = None):
+        """绘制节点，node_ids为空时绘制全部节点，fill为空时按可视化状态着色"""
+        rooms = self._room_draw
+        corridors = self._corridor_draw
+        if node_ids is not None:
+            rooms = [(nid, rect) for nid, rect in rooms if nid in node_ids]
+            corridors = [(nid, rect) for nid, rect in corridors if nid in node_ids]
+        
+        # 房间：轴对齐矩形无需抗锯齿，同色房间一次批量绘制
+        painter.setRenderHint(QPainter.Antialiasing, False)
         painter.setPen(QPen(self.colors['room_border'], 2))
-        painter.drawRect(rect)
-    
-    def _draw_corridor(self, painter: QPainter, pos: QPoint, size: QSize, color: QColor):
-        """绘制走廊"""
-        rect = QRect(pos.x() - size.width()//2, pos.y() - size.height()//2, 
-                    size.width(), size.height())
+        for color, rects in self._group_rects_by_color(rooms, fill):
+            painter.setBrush(QBrush(color))
+            painter.drawRects(rects)
         
-        # 绘制填充
-        painter.setBrush(QBrush(color))
+        # 走廊：同色走廊合并为一个路径绘制
+        painter.setRenderHint(QPainter.Antialiasing, True)
         painter.setPen(QPen(self.colors['corridor_border'], 2))
-        painter.drawEllipse(rect)
+        for color, rects in self._group_rects_by_color(corridors, fill):
+            path = QPainterPath()
+            path.setFillRule(Qt.WindingFill)
+            for rect in rects:
+                path.addEllipse(QRectF(rect))
+            painter.setBrush(QBrush(color))
+            painter.drawPath(path)
+    
+    def _group_rects_by_color(self, items: List[Tuple[str, QRect]],
+                              fill: Optional[QColor]) -> List[Tuple[QColor, List[QRect]]]:
+        """按填充颜色分组节点矩形，按状态优先级从低到高排列"""
+        if fill is not None:
+            return [(fill, [rect for _, rect in items])]
+        groups = {}
+        for node_id, rect in items:
+            groups.setdefault(int(self._state[self._node_idx[node_id]]), []).append(rect)
+        return [(self._color_by_state[state], rects) for state, rects in sorted(groups.items())]
     
-    def _draw_node_labels(self, painter: QPainter):
+    def _draw_node_labels(self, painter: QPainter, node_ids: Optional[Set[str]] = None,
+                          highlight: bool = True):
         """所有节点仅在节点中心绘制数字（无rect背景），关键节点高亮，数字居中"""
-        for node_id, pos in self.node_positions.items():
-            size = self.node_sizes.get(node_id, QSize(20, 20))
-            label = node_id[-3:] if len(node_id) > 3 else node_id
-            font_size = max(8, min(size.width(), size.height()) // 2)
-            font = QFont('Arial', font_size)
-            if node_id == self.start_node:
-                font.setBold(True)
-                painter.setPen(self.colors['start'])
-            elif node_id == self.end_node:
-                font.setBold(True)
-                painter.setPen(self.colors['end'])
-            elif node_id == self.current_node:
-                font.setBold(True)
-                painter.setPen(self.colors['current'])
-            else:
-                font.setBold(False)
-                painter.setPen(self.colors['text'])
-            painter.setFont(font)
-            # 用QRect居中显示数字，无rect背景
-            rect = QRect(pos.x() - size.width()//2, pos.y() - size.height()//2, size.width(), size.height())
+        painter.setRenderHint(QPainter.TextAntialiasing, True)
+        
+        # 关键节点（起点、终点、当前节点）加粗并使用对应颜色，优先级依次降低
+        emphasis = {}
+        if highlight:
+            for node_id, key in ((self.current_node, 'current'), (self.end_node, 'end'),
+                                 (self.start_node, 'start')):
+                if node_id in self._label_info:
+                    emphasis[node_id] = self.colors[key]
+        
+        # 普通标签：画笔只设置一次，字体仅在尺寸变化时切换
+        painter.setPen(self.colors['text'])
+        font = None
+        for node_id, (rect, label) in self._label_info.items():
+            if node_id in emphasis or (node_ids is not None and node_id not in node_ids):
+                continue
+            regular = self._font_for_node[node_id][0]
+            if regular is not font:
+                painter.setFont(regular)
+                font = regular
+            painter.drawText(rect, Qt.AlignCenter, label)
+        
+        for node_id, color in emphasis.items():
+            rect, label = self._label_info[node_id]
+            painter.setPen(color)
+            painter.setFont(self._font_for_node[node_id][1])
             painter.drawText(rect, Qt.AlignCenter, label)
     
     def set_visualization_state(self, visited: Set[str], current: Optional[str], 
                                queue: Set[str], path: List[str], 
                                start: Optional[str], end: Optional[str]):
-        """设置可视化状态"""
-        self.visited_nodes = visited.copy()
+        """设置可视化状态（传入的集合视为只读快照，直接引用不再复制）"""
+        self.visited_nodes = visited
         self.current_node = current
-        self.queue_nodes = queue.copy()
-        self.path_nodes = path.copy()
+        self.queue_nodes = queue
+        self.path_nodes = path
         self.start_node = start
         self.end_node = end
+        
+        # 按优先级从低到高写入状态数组，高优先级覆盖低优先级
+        idx = self._node_idx
+        self._state[:] = NODE_UNVISITED
+        for nodes, value in ((queue, NODE_QUEUE), (visited, NODE_VISITED), (path, NODE_PATH)):
+            self._state[[idx[n] for n in nodes if n in idx]] = value
+        for node, value in ((current, NODE_CURRENT), (end, NODE_END), (start, NODE_START)):
+            if node in idx:
+                self._state[idx[node]] = value
         self.update()
     
     def mousePressEvent(self, event):
@@ -435,7 +875,7 @@ class DungeonCanvas(QWidget):
             delta = event.pos() - self.last_pan_point
             self.pan_offset += delta
             self.last_pan_point = event.pos()
-            self.update()
+            self._schedule_repaint()
         event.accept()
     
     def mouseReleaseEvent(self, event):
@@ -459,21 +899,29 @@ class DungeonCanvas(QWidget):
         scale_ratio = self.scale_factor / old_scale
         self.pan_offset = mouse_pos - (mouse_pos - self.pan_offset) * scale_ratio
         
-        self.update()
+        self._schedule_repaint()
         event.accept()
+    
+    def _schedule_repaint(self):
+        """安排一次延迟重绘，合并连续的鼠标事件"""
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
 
 
 class BFSWorker(QThread):
     """BFS算法工作线程"""
     
-    # 信号定义
-    state_updated = pyqtSignal(set, str, set, list, str, str)  # visited, current, queue, path, start, end
+    # 信号定义；visited/queue为frozenset快照、path为tuple，接收方不得修改
+    state_updated = pyqtSignal(object, str, object, object, str, str)  # visited, current, queue, path, start, end
     finished = pyqtSignal()
     error = pyqtSignal(str)
     
-    def __init__(self, graph: Dict[str, List[str]], start_node: str, target_node: Optional[str] = None):
+    # 两次状态更新（重绘）的最小间隔，约一帧；动画延迟小于该值时才会合并更新
+    FRAME_MS = 16
+    
+    def __init__(self, csr: GraphCSR, start_node: str, target_node: Optional[str] = None):
         super().__init__()
-        self.graph = graph
+        self.csr = csr
         self.start_node = start_node
         self.target_node = target_node
         self.delay_ms = 500  # 动画延迟
@@ -485,46 +933,63 @@ class BFSWorker(QThread):
     def run(self):
         """运行BFS算法"""
         try:
-            if self.start_node not in self.graph:
+            id_to_idx = self.csr.id_to_idx
+            idx_to_id = self.csr.idx_to_id
+            if self.start_node not in id_to_idx:
                 self.error.emit(f"Starting node {self.start_node} not exist")
                 return
             
-            if self.target_node and self.target_node not in self.graph:
+            if self.target_node and self.target_node not in id_to_idx:
                 self.error.emit(f"Target node {self.target_node} not exist")
                 return
             
-            # BFS算法
+            # 遍历时使用Python列表，避免逐元素访问numpy数组的开销
+            indptr = self.csr.indptr.tolist()
+            indices = self.csr.indices.tolist()
+            start = id_to_idx[self.start_node]
+            target = id_to_idx[self.target_node] if self.target_node else -1
+            
+            # BFS算法：队列只保存节点下标，路径在发送状态时由父指针回溯得到
+            # parent为-2表示尚未发现，-1表示起点
+            parent = [-2] * len(idx_to_id)
+            parent[start] = -1
             visited = set()
-            queue = deque([(self.start_node, [self.start_node])])
-            parent = {}
+            queue = deque([start])
+            queue_set = {self.start_node}  # 与队列同步维护，避免每步重建
+            
+            # 每一步按动画延迟推进；延迟短于一帧时合并同一帧内的多次更新
+            frame_interval = self.FRAME_MS / 1000
+            last_emit = float('-inf')
             
             while queue:
-                current, path = queue.popleft()
-                
-                if current in visited:
-                    continue
+                current = queue.popleft()
+                current_id = idx_to_id[current]
+                queue_set.discard(current_id)
+                visited.add(current_id)
                 
-                visited.add(current)
+                # 添加邻居节点（已发现的节点不再重复入队），找到目标时不再扩展
+                found = current == target
+                if not found:
+                    for neighbor in indices[indptr[current]:indptr[current + 1]]:
+                        if parent[neighbor] == -2:
+                            parent[neighbor] = current
+                            queue.append(neighbor)
+                            queue_set.add(idx_to_id[neighbor])
                 
-                # 发送状态更新
-                current_queue = {node for node, _ in queue}
-                self.state_updated.emit(
-                    visited.copy(), current, current_queue, 
-                    path, self.start_node, self.target_node
-                )
+                # 发送状态更新（合并一帧内的多次更新，最后一步总是发送）
+                now = time.monotonic()
+                if found or not queue or now - last_emit >= frame_interval:
+                    self.state_updated.emit(
+                        frozenset(visited), current_id, frozenset(queue_set),
+                        self._reconstruct_path(parent, idx_to_id, current),
+                        self.start_node, self.target_node
+                    )
+                    last_emit = now
                 
                 # 如果找到目标节点
-                if self.target_node and current == self.target_node:
+                if found:
                     break
                 
-                # 添加邻居节点
-                for neighbor in self.graph[current]:
-                    if neighbor not in visited:
-                        parent[neighbor] = current
-                        new_path = path + [neighbor]
-                        queue.append((neighbor, new_path))
-                
-                # 延迟
                 self.msleep(self.delay_ms)
             
             self.finished.emit()
@@ -532,6 +997,16 @@ class BFSWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
+    @staticmethod
+    def _reconstruct_path(parent: List[int], idx_to_id: List[str], node: int) -> Tuple[str, ...]:
+        """沿父指针回溯，得到从起点到node的路径"""
+        path = []
+        while node >= 0:
+            path.append(idx_to_id[node])
+            node = parent[node]
+        path.reverse()
+        return tuple(path)
+
 
 class QtBFSVisualizer(QMainWindow):
     """Qt BFS可视化器主窗口"""
@@ -541,6 +1016,10 @@ class QtBFSVisualizer(QMainWindow):
         self.graph = {}
         self.dungeon_data = None  # 添加dungeon_data属性
         self.bfs_worker = None
+        # 最短路径缓存：{起点, 终点} -> (计算时的起点, 路径数, 路径列表)，图变化时清空
+        self._paths_cache: Dict[frozenset, Tuple[str, int, List[List[str]]]] = {}
+        # 单源BFS缓存：源点下标 -> (dist, preds)，供不同终点的路径查询复用，图变化时清空
+        self._bfs_cache: Dict[int, Tuple[List[int], List[List[int]]]] = {}
         
         self.init_ui()
         
@@ -716,17 +1195,15 @@ class QtBFSVisualizer(QMainWindow):
         )
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    dungeon_data = json.load(f)
+                dungeon_data = load_dungeon_json(file_path)
                 
                 # 保存dungeon_data到实例变量
                 self.dungeon_data = dungeon_data
                 
-                # 构建图结构
-                self.graph = self.canvas._build_graph(dungeon_data)
-                
-                # 加载到画布
+                # 加载到画布，图结构由画布构建后共用
                 if self.canvas.load_dungeon_data(dungeon_data):
+                    self.graph = self.canvas.graph
+                    self._reset_path_caches()
                     self.update_node_combos()
                     self.start_btn.setEnabled(True)  # 启用BFS开始按钮
                     self.statusBar().showMessage(f"Loaded files: {Path(file_path).name}")
@@ -759,7 +1236,7 @@ class QtBFSVisualizer(QMainWindow):
             return
         
         # 创建并启动BFS工作线程
-        self.bfs_worker = BFSWorker(self.graph, start_node, target_node)
+        self.bfs_worker = BFSWorker(self.canvas.csr, start_node, target_node)
         self.bfs_worker.state_updated.connect(self.update_visualization)
         self.bfs_worker.finished.connect(self.bfs_finished)
         self.bfs_worker.error.connect(self.bfs_error)
@@ -834,24 +1311,17 @@ class QtBFSVisualizer(QMainWindow):
         
         # 简单的可达性分析
         all_nodes = set(self.graph.keys())
-        reachable_from_start = set()
+        csr = self.canvas.csr
+        start_node = self.start_node_combo.currentText()
         
-        if self.start_node_combo.currentText():
-            start_node = self.start_node_combo.currentText()
-            # 使用BFS计算可达节点
-            visited = set()
-            queue = deque([start_node])
-            
-            while queue:
-                current = queue.popleft()
-                if current in visited:
-                    continue
-                visited.add(current)
-                reachable_from_start.add(current)
-                
-                for neighbor in self.graph[current]:
-                    if neighbor not in visited:
-                        queue.append(neighbor)
+        if start_node in csr.id_to_idx:
+            # 基于邻居位掩码的位集遍历计算可达节点
+            reachable = csr.reachable_bits(csr.id_to_idx[start_node])
+            reachable_from_start = set()
+            while reachable:
+                low = reachable & -reachable
+                reachable_from_start.add(csr.idx_to_id[low.bit_length() - 1])
+                reachable ^= low
             
             unreachable = all_nodes - reachable_from_start
             
@@ -885,20 +1355,25 @@ class QtBFSVisualizer(QMainWindow):
             QMessageBox.warning(self, "Warning", "No room data found")
             return
         
-        # 分析所有房间对之间的路径
+        # 分析所有房间对之间的路径：一次性得到房间两两之间的最短路径条数
         path_counts = []
-        path_distribution = {}  # 统计路径数量分布
-        
-        for i in range(len(room_nodes)):
-            for j in range(i+1, len(room_nodes)):
-                room1, room2 = room_nodes[i], room_nodes[j]
-                count, _ = self._find_all_shortest_paths(room1, room2)
-                if count > 0:
-                    path_counts.append(count)
-                    # 统计路径数量分布
-                    if count not in path_distribution:
-                        path_distribution[count] = []
-                    path_distribution[count].append(f"{room1}->{room2}")
+        # 统计路径数量分布：每种路径数只保留最多3个房间对下标作为示例，输出时再格式化
+        path_distribution = Counter()
+        distribution_samples: Dict[int, List[Tuple[int, int]]] = {}
+        csr = self.canvas.csr
+        pair_counts = csr.pairwise_path_counts([csr.id_to_idx[room] for room in room_nodes])
+        upper_i, upper_j = np.triu_indices(len(room_nodes), 1)
+        
+        for i, j, count in zip(upper_i.tolist(), upper_j.tolist(),
+                               pair_counts[upper_i, upper_j].tolist()):
+            count = int(count)
+            if count > 0:
+                path_counts.append(count)
+                # 统计路径数量分布
+                path_distribution[count] += 1
+                samples = distribution_samples.setdefault(count, [])
+                if len(samples) < 3:
+                    samples.append((i, j))
         
         if not path_counts:
             self.info_text.setText("Path diversity analysis:\nNo available rooms found.")
@@ -918,16 +1393,16 @@ class QtBFSVisualizer(QMainWindow):
         
         info += f"Distribution of path numbers:\n"
         for count in sorted(path_distribution.keys()):
-            room_pairs = path_distribution[count]
-            info += f"  {count}path: {len(room_pairs)}For the room\n"
+            num_pairs = path_distribution[count]
+            info += f"  {count}path: {num_pairs}For the room\n"
             # 只显示前3个房间对作为示例
-            if len(room_pairs) <= 3:
-                for pair in room_pairs:
-                    info += f"    {pair}\n"
-            else:
-                for pair in room_pairs[:2]:
-                    info += f"    {pair}\n"
-                info += f"    ... Left{len(room_pairs)-2}Pair\n"
+            samples = distribution_samples[count]
+            if num_pairs > 3:
+                samples = samples[:2]
+            for i, j in samples:
+                info += f"    {room_nodes[i]}->{room_nodes[j]}\n"
+            if num_pairs > 3:
+                info += f"    ... Left{num_pairs-2}Pair\n"
         
         # 添加评分信息
         max_diversity = 5.0
@@ -1014,67 +1489,53 @@ class QtBFSVisualizer(QMainWindow):
         dialog.setLayout(layout)
         dialog.exec_()
 
+    def _reset_path_caches(self):
+        """图结构变化后清空路径缓存"""
+        self._paths_cache.clear()
+        self._bfs_cache.clear()
+    
     def _find_all_shortest_paths(self, start: str, end: str) -> Tuple[int, List[List[str]]]:
-        """计算两个节点之间的所有最短路径"""
-        if start == end:
-            return 1, [[start]]
-        
-        # 使用BFS找到最短路径长度
-        visited = set()
-        queue = deque([(start, 0)])
-        visited.add(start)
-        shortest_length = None
-        
-        while queue:
-            curr, length = queue.popleft()
-            if curr == end:
-                shortest_length = length
-                break
-            for nb in self.graph[curr]:
-                if nb not in visited:
-                    visited.add(nb)
-                    queue.append((nb, length + 1))
-        
-        if shortest_length is None:
+        """计算两个节点之间的所有最短路径（无向图，正反方向共用缓存）"""
+        key = frozenset((start, end))
+        cached = self._paths_cache.get(key)
+        if cached is not None:
+            cached_start, count, paths = cached
+            if cached_start != start:
+                paths = [path[::-1] for path in paths]
+            return count, paths
+        
+        count, paths = self._enumerate_shortest_paths(start, end)
+        self._paths_cache[key] = (start, count, paths)
+        return count, paths
+    
+    def _get_bfs(self, src: int) -> Tuple[List[int], List[List[int]]]:
+        """取单源BFS的(dist, preds)，同一源点在图变化前只计算一次"""
+        entry = self._bfs_cache.get(src)
+        if entry is None:
+            entry = self._bfs_cache[src] = self.canvas.csr.shortest_path_dag(src)
+        return entry
+    
+    def _enumerate_shortest_paths(self, start: str, end: str) -> Tuple[int, List[List[str]]]:
+        """枚举两个节点之间的所有最短路径"""
+        csr = self.canvas.csr
+        src, dst = csr.id_to_idx[start], csr.id_to_idx[end]
+        dist, preds = self._get_bfs(src)
+        if dist[dst] == -1:
             return 0, []  # 不可达
         
-        # 计算所有最短路径
-        def find_paths_with_length(curr, target, remaining_length, visited, current_path):
-            if remaining_length == 0:
-                if curr == target:
-                    return [current_path + [curr]]
-                return []
-            if remaining_length < 0:
-                return []
-            
-            paths = []
-            for nb in self.graph[curr]:
-                if nb not in visited:
-                    new_paths = find_paths_with_length(nb, target, remaining_length - 1, 
-                                                     visited | {curr}, current_path + [curr])
-                    paths.extend(new_paths)
-            return paths
-        
-        all_paths = find_paths_with_length(start, end, shortest_length, set(), [])
-        return len(all_paths), all_paths
+        idx_to_id = csr.idx_to_id
+        paths = [[idx_to_id[i] for i in path] for path in GraphCSR.iter_dag_paths(preds, src, dst)]
+        return len(paths), paths
     
     def _find_shortest_path(self, start: str, end: str):
         """BFS找最短路径，返回节点序列"""
-        if start == end:
-            return [start]
-        visited = set()
-        queue = deque([[start]])
-        while queue:
-            path = queue.popleft()
-            node = path[-1]
-            if node == end:
-                return path
-            if node not in visited:
-                visited.add(node)
-                for neighbor in self.graph.get(node, []):
-                    if neighbor not in visited:
-                        queue.append(path + [neighbor])
-        return None
+        csr = self.canvas.csr
+        if start not in csr.id_to_idx or end not in csr.id_to_idx:
+            return [start] if start == end else None
+        path = csr.shortest_path(csr.id_to_idx[start], csr.id_to_idx[end])
+        if path is None:
+            return None
+        return [csr.idx_to_id[i] for i in path]
     
     def show_about(self):
         """显示关于对话框"""
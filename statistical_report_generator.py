@@ -4,13 +4,33 @@
 """
 
 import os
-import json
+import io
+import heapq
 import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, TextIO
+
+# orjson可用时解析更快；遇到NaN/Infinity字面量时回退到标准库json
+from src.json_io import json_loads
+
+# 描述性统计表的列顺序
+DESC_STAT_COLUMNS = ['mean', 'std', 'min', 'max', 'median', 'q25', 'q75']
+
+
+@lru_cache(maxsize=None)
+def _pretty_name(name: str) -> str:
+    """指标名转为显示用标题，如 dead_end_ratio -> Dead End Ratio"""
+    return name.replace('_', ' ').title()
+
+
+def _abs_spearman(corr: Dict[str, Any]) -> float:
+    """相关性条目按Spearman系数绝对值排序的键"""
+    return abs(corr.get('spearman_correlation', 0))
+
 
 class StatisticalReportGenerator:
     """统计报告生成器 - Markdown格式"""
@@ -23,17 +43,20 @@ class StatisticalReportGenerator:
             data_path: 统计分析报告JSON文件路径
         """
         self.data_path = data_path
+        self._basename = os.path.basename(data_path)
         self.data = self.load_data()
         
     def load_data(self) -> Dict[str, Any]:
         """加载统计分析数据"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.data_path, 'rb') as f:
+                return json_loads(f.read())
         except Exception as e:
             raise Exception(f"Failed to load data from {self.data_path}: {e}")
     
-    def format_p_value(self, p_value: float) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def format_p_value(p_value: float) -> str:
         """格式化p值显示"""
         if p_value < 0.001:
             return "< 0.001"
@@ -42,8 +65,19 @@ class StatisticalReportGenerator:
         else:
             return f"{p_value:.3f}"
     
+    @staticmethod
+    def _row(*cells: Any) -> str:
+        """格式化一行Markdown表格"""
+        return "| %s |\n" % " | ".join(map(str, cells))
+    
     def generate_markdown_report(self) -> str:
         """生成完整的Markdown报告"""
+        buffer = io.StringIO()
+        self._write_report(buffer)
+        return buffer.getvalue()
+    
+    def _write_report(self, fh: TextIO) -> None:
+        """按章节把Markdown报告逐段写入已打开的文本文件对象"""
         
         # 提取数据
         analysis_summary = self.data.get('analysis_summary', {})
@@ -51,12 +85,16 @@ class StatisticalReportGenerator:
         correlation_analysis = self.data.get('correlation_analysis', {})
         group_comparison = self.data.get('group_comparison_analysis', {})
         advanced_analysis = self.data.get('advanced_analysis', {})
+        row = self._row
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        top_overall: List[Dict[str, Any]] = []
         
-        # 开始构建Markdown
-        md = f"""# Statistical Analysis Report
+        # 开始构建Markdown：各片段生成后直接写出，不在内存中拼接整份报告
+        write = fh.write
+        write(f"""# Statistical Analysis Report
 
-**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-**Data Source:** {os.path.basename(self.data_path)}  
+**Generated on:** {now_str}  
+**Data Source:** {self._basename}  
 **Analysis Type:** Comprehensive Statistical Analysis of Dungeon Quality Metrics
 
 ---
@@ -74,25 +112,30 @@ class StatisticalReportGenerator:
 | **Non-Normal Distributions** | {analysis_summary.get('non_normally_distributed_metrics', 0)} |
 | **Significant Group Differences** | {analysis_summary.get('significant_group_differences', 0)}/{analysis_summary.get('normality_tests_performed', 0)} ({analysis_summary.get('proportion_with_group_differences', 0)*100:.1f}%) |
 
-"""
+""")
 
         # 描述性统计
         if desc_stats:
-            md += """## 📈 Descriptive Statistics
+            write("""## 📈 Descriptive Statistics
 
 | Metric | Mean | Std Dev | Min | Max | Median | Q25 | Q75 |
 |--------|------|---------|-----|-----|---------|-----|-----|
-"""
-            for metric, stats in desc_stats.items():
-                if metric != 'overall_score':
-                    md += f"| **{metric.replace('_', ' ').title()}** | {stats.get('mean', 0):.3f} | {stats.get('std', 0):.3f} | {stats.get('min', 0):.3f} | {stats.get('max', 0):.3f} | {stats.get('median', 0):.3f} | {stats.get('q25', 0):.3f} | {stats.get('q75', 0):.3f} |\n"
+""")
+            # 整表装入DataFrame按列格式化；缺失或为空的统计量保持NaN并显示为nan，不伪装成0
+            metrics = [metric for metric in desc_stats if metric != 'overall_score']
+            stats_df = (pd.DataFrame.from_dict(desc_stats, orient='index')
+                        .reindex(index=metrics, columns=DESC_STAT_COLUMNS)
+                        .astype(float))
+            cells = stats_df.apply(lambda col: col.map('{:.3f}'.format))
+            for metric, values in zip(cells.index, cells.itertuples(index=False, name=None)):
+                write(row(f"**{_pretty_name(metric)}**", *values))
             
-            md += "\n"
+            write("\n")
 
         # 正态性检验和组间比较
         if group_comparison:
             summary = group_comparison.get('summary', {})
-            md += f"""## 🔬 Distribution Analysis & Group Comparisons
+            write(f"""## 🔬 Distribution Analysis & Group Comparisons
 
 ### Summary Statistics
 
@@ -110,7 +153,7 @@ class StatisticalReportGenerator:
 
 | Metric | Distribution | Test Used | Test Statistic | P-value | Significant? | Post-hoc Pairs |
 |--------|--------------|-----------|----------------|---------|--------------|----------------|
-"""
+""")
             
             normality_tests = group_comparison.get('normality_tests', {})
             statistical_tests = group_comparison.get('statistical_tests', {})
@@ -120,7 +163,7 @@ class StatisticalReportGenerator:
                 stat_data = statistical_tests.get(metric_name, {})
                 
                 is_normal = norm_data.get('is_normal', False)
-                test_used = stat_data.get('test_used', 'Unknown').replace('_', ' ').title()
+                test_used = _pretty_name(stat_data.get('test_used', 'Unknown'))
                 test_stat = stat_data.get('h_statistic') or stat_data.get('f_statistic', 0)
                 p_value = stat_data.get('p_value', 1.0)
                 is_significant = stat_data.get('significant_at_05', False)
@@ -133,15 +176,16 @@ class StatisticalReportGenerator:
                 significance = "Yes ✅" if is_significant else "No ❌"
                 post_hoc_str = f"{sig_pairs_count} pairs" if sig_pairs_count > 0 else "None"
                 
-                md += f"| **{metric_name.replace('_', ' ').title()}** | {distribution} | {test_used} | {test_stat:.3f} | {self.format_p_value(p_value)} | {significance} | {post_hoc_str} |\n"
+                write(row(f"**{_pretty_name(metric_name)}**", distribution, test_used,
+                          f"{test_stat:.3f}", self.format_p_value(p_value), significance, post_hoc_str))
             
-            md += "\n"
+            write("\n")
 
         # 相关性分析
         if correlation_analysis:
-            md += """## 🔗 Correlation Analysis
+            write("""## 🔗 Correlation Analysis
 
-"""
+""")
             
             # 逻辑一致性
             consistency_score = correlation_analysis.get('logical_consistency_score', 0)
@@ -149,70 +193,75 @@ class StatisticalReportGenerator:
             total_expected = correlation_analysis.get('total_expected_correlations', 0)
             inconsistencies = correlation_analysis.get('logical_inconsistencies', [])
             
-            md += f"""### Logical Consistency Analysis
+            write(f"""### Logical Consistency Analysis
 
 - **Consistency Score:** {consistency_score:.3f}
 - **Expected Correlations Found:** {expected_found}/{total_expected}
 - **Logical Inconsistencies:** {len(inconsistencies)}
 
-"""
+""")
             
             if inconsistencies:
-                md += """### Logical Inconsistencies
+                write("""### Logical Inconsistencies
 
 | Metric 1 | Metric 2 | Expected | Actual ρ | FDR P-value |
 |----------|----------|----------|----------|-------------|
-"""
+""")
                 for inc in inconsistencies[:5]:  # 只显示前5个
-                    md += f"| **{inc['metric1'].replace('_', ' ').title()}** | **{inc['metric2'].replace('_', ' ').title()}** | {inc['expected']} | {inc['actual_spearman']:.3f} | {self.format_p_value(inc['fdr_p_value'])} |\n"
-                md += "\n"
+                    write(row(f"**{_pretty_name(inc['metric1'])}**",
+                              f"**{_pretty_name(inc['metric2'])}**", inc['expected'],
+                              f"{inc['actual_spearman']:.3f}", self.format_p_value(inc['fdr_p_value'])))
+                write("\n")
             
             # 强相关关系
             strong_corrs = correlation_analysis.get('strong_correlations', [])
             if strong_corrs:
-                md += """### Strong Correlations (|ρ| ≥ 0.7)
+                write("""### Strong Correlations (|ρ| ≥ 0.7)
 
 | Metric 1 | Metric 2 | Spearman ρ | FDR P-value | Expected | Consistent? |
 |----------|----------|-------------|-------------|----------|-------------|
-"""
+""")
                 for corr in strong_corrs:
                     rho = corr.get('spearman_correlation', 0)
                     p_val = corr.get('fdr_p_value', 1.0)
                     expected = corr.get('expected_direction', 'none')
                     consistent = "✅" if corr.get('logically_consistent', True) else "⚠️"
                     
-                    md += f"| **{corr.get('metric1', '').replace('_', ' ').title()}** | **{corr.get('metric2', '').replace('_', ' ').title()}** | **{rho:.3f}** | {self.format_p_value(p_val)} | {expected} | {consistent} |\n"
-                md += "\n"
+                    write(row(f"**{_pretty_name(corr.get('metric1', ''))}**",
+                              f"**{_pretty_name(corr.get('metric2', ''))}**", f"**{rho:.3f}**",
+                              self.format_p_value(p_val), expected, consistent))
+                write("\n")
             
             # 与总分的相关性
             overall_corrs = correlation_analysis.get('overall_score_correlations', [])
             if overall_corrs:
-                # 按相关性强度排序
-                overall_corrs.sort(key=lambda x: abs(x.get('spearman_correlation', 0)), reverse=True)
+                # 按相关性强度取前10个，只做部分排序且不改动原始数据
+                top_overall = heapq.nlargest(10, overall_corrs, key=_abs_spearman)
                 
-                md += """### Top Correlations with Overall Score
+                write("""### Top Correlations with Overall Score
 
 | Metric | Spearman ρ | P-value | Significance |
 |--------|-------------|---------|--------------|
-"""
-                for corr in overall_corrs[:10]:  # 前10个
+""")
+                for corr in top_overall:
                     rho = corr.get('spearman_correlation', 0)
                     p_val = corr.get('spearman_p_value', 1.0)
                     is_sig = "✅ Significant" if p_val < 0.05 else "❌ Not significant"
                     
-                    md += f"| **{corr.get('metric', '').replace('_', ' ').title()}** | **{rho:.3f}** | {self.format_p_value(p_val)} | {is_sig} |\n"
-                md += "\n"
+                    write(row(f"**{_pretty_name(corr.get('metric', ''))}**", f"**{rho:.3f}**",
+                              self.format_p_value(p_val), is_sig))
+                write("\n")
 
         # 高级分析
         if advanced_analysis:
-            md += """## 🧠 Advanced Analysis
+            write("""## 🧠 Advanced Analysis
 
-"""
+""")
             
             # VIF分析
             vif_data = advanced_analysis.get('vif_analysis', {})
             if vif_data:
-                md += f"""### Multicollinearity Analysis (VIF)
+                write(f"""### Multicollinearity Analysis (VIF)
 
 | Statistic | Value |
 |-----------|-------|
@@ -220,20 +269,21 @@ class StatisticalReportGenerator:
 | **High VIF (>5)** | {vif_data.get('high_vif_count', 0)} metrics |
 | **Maximum VIF** | {vif_data.get('max_vif', 0):.2f} |
 
-"""
+""")
                 
                 # 详细VIF结果
                 vif_results = vif_data.get('vif_results', [])
                 if vif_results:
-                    md += """#### Detailed VIF Results
+                    write("""#### Detailed VIF Results
 
 | Metric | VIF Score | Level |
 |--------|-----------|-------|
-"""
+""")
                     for vif in vif_results:
                         level_emoji = "🔴" if vif['vif'] > 10 else ("🟡" if vif['vif'] > 5 else "🟢")
-                        md += f"| **{vif['metric'].replace('_', ' ').title()}** | {vif['vif']:.2f} | {level_emoji} {vif.get('level', 'OK')} |\n"
-                    md += "\n"
+                        write(row(f"**{_pretty_name(vif['metric'])}**", f"{vif['vif']:.2f}",
+                                  f"{level_emoji} {vif.get('level', 'OK')}"))
+                    write("\n")
             
             # PCA分析
             pca_data = advanced_analysis.get('pca_analysis', {})
@@ -244,7 +294,7 @@ class StatisticalReportGenerator:
                     pc2_var = explained_var[1]
                     cumulative_2pc = pc1_var + pc2_var
                     
-                    md += f"""### Principal Component Analysis
+                    write(f"""### Principal Component Analysis
 
 | Component | Variance Explained | Cumulative |
 |-----------|-------------------|------------|
@@ -253,10 +303,10 @@ class StatisticalReportGenerator:
 
 **Key Finding:** First 2 principal components explain **{cumulative_2pc*100:.1f}%** of total variance.
 
-"""
+""")
 
         # 关键发现和建议
-        md += f"""## 💡 Key Findings & Recommendations
+        write(f"""## 💡 Key Findings & Recommendations
 
 ### 🎯 Key Findings
 
@@ -266,18 +316,16 @@ class StatisticalReportGenerator:
 
 3. **Correlation Structure:** Found {analysis_summary.get('strong_correlations_count', 0)} strong correlations and {analysis_summary.get('moderate_correlations_count', 0)} moderate correlations between metrics.
 
-4. **Logical Consistency:** {consistency_score*100:.1f}% of expected correlations were logically consistent."""
+4. **Logical Consistency:** {consistency_score*100:.1f}% of expected correlations were logically consistent.""")
 
-        # 添加最佳预测指标
-        if correlation_analysis and 'overall_score_correlations' in correlation_analysis:
-            overall_corrs = correlation_analysis['overall_score_correlations']
-            if overall_corrs:
-                top_corr = max(overall_corrs, key=lambda x: abs(x.get('spearman_correlation', 0)))
-                top_metric = top_corr.get('metric', '').replace('_', ' ').title()
-                top_rho = top_corr.get('spearman_correlation', 0)
-                md += f"\n\n5. **Best Quality Predictor:** {top_metric} shows the strongest correlation with overall quality (ρ = {top_rho:.3f})."
+        # 添加最佳预测指标（即与总分相关性最强的一项）
+        if top_overall:
+            top_corr = top_overall[0]
+            top_metric = _pretty_name(top_corr.get('metric', ''))
+            top_rho = top_corr.get('spearman_correlation', 0)
+            write(f"\n\n5. **Best Quality Predictor:** {top_metric} shows the strongest correlation with overall quality (ρ = {top_rho:.3f}).")
 
-        md += """
+        write(f"""
 
 ### 📋 Statistical Methodology
 
@@ -309,26 +357,26 @@ class StatisticalReportGenerator:
 **Sample Size:** {analysis_summary.get('total_maps', 0)} dungeon maps  
 **Metrics Analyzed:** {analysis_summary.get('metrics_analyzed', 0)} quality dimensions  
 
-**Report Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        
-        return md
+**Report Generated:** {now_str}
+""")
     
     def save_report(self, output_path: str) -> bool:
         """保存Markdown报告到文件"""
+        # 先流式写入同目录下的临时文件，成功后再替换目标文件，避免中途出错留下不完整的报告
+        tmp_path = Path(f"{output_path}.tmp")
         try:
-            md_content = self.generate_markdown_report()
-            
             # 确保输出目录存在
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(md_content)
+            with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+                self._write_report(f)
+            os.replace(tmp_path, output_path)
             
             print(f"✅ Statistical report saved to: {output_path}")
             return True
             
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
             print(f"❌ Failed to save report: {e}")
             return False
 